@@ -10,13 +10,24 @@ __version__ = (3, 1, 1)
 
 import aiohttp
 import asyncio
+import contextlib
+import hashlib
 import io
 import json
 import logging
+import multiprocessing
+import os
+import pickle
 import random
 import string
+import struct
+import threading
 import typing
 import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
 
 import telethon
@@ -28,284 +39,1353 @@ from .. import loader, utils
 logger = logging.getLogger(__name__)
 
 
-class Banners:
+class TTLCache:
+    """Size-bounded LRU whose entries also expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: typing.Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+            self._data.pop(key, None)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key, value, ttl: typing.Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class MetadataCache:
+    """Track, album, artist and playlist objects, shared by all commands.
+
+    Track misses are fetched in a single tracks() call; playlists change more
+    often than the rest and get a shorter TTL.
+    """
+
     def __init__(
-        self,
-        title: str,
-        artists: list[str],
-        duration: int,
-        progress: int,
-        track_cover: bytes,
-        fonts_data: list[bytes],
-        album_title: str = "Сингл",
-        meta_info: str = "Music",
-        is_liked: bool = False,
-        repeat_mode: str = "NONE",
-        blur: int = 0,
+        self, maxsize: int = 500, ttl: float = 6 * 3600, playlist_ttl: float = 600
     ):
-        self.title = title
-        self.artists = artists
-        self.duration = duration
-        self.progress = progress
-        self.track_cover = track_cover
-        self.fonts_data = fonts_data
-        self.album_title = album_title
-        self.meta_info = meta_info
-        self.is_liked = is_liked
-        self.repeat_mode = repeat_mode
-        self.blur = blur
+        self.tracks = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.albums = TTLCache(maxsize=maxsize // 5, ttl=ttl)
+        self.artists = TTLCache(maxsize=maxsize // 5, ttl=ttl)
+        self.playlists = TTLCache(maxsize=maxsize // 5, ttl=playlist_ttl)
+
+    @staticmethod
+    def _track_key(track_id) -> str:
+        # "12345:678" (track:album) and 12345 refer to the same track
+        return str(track_id).split(":")[0]
+
+    async def get_tracks(self, client: yandex_music.ClientAsync, track_ids) -> list:
+        keys = [self._track_key(track_id) for track_id in track_ids]
+        found = {}
+        misses = []
+        for key in keys:
+            track = self.tracks.get(key)
+            if track is None:
+                misses.append(key)
+            else:
+                found[key] = track
+
+        if misses:
+            for track in await client.tracks(list(dict.fromkeys(misses))):
+                key = self._track_key(track.id)
+                self.tracks.set(key, track)
+                found[key] = track
+
+        return [found[key] for key in keys if key in found]
+
+    async def get_track(self, client: yandex_music.ClientAsync, track_id):
+        tracks = await self.get_tracks(client, [track_id])
+        return tracks[0] if tracks else None
+
+    async def _get_one(self, cache: TTLCache, fetch, entity_id):
+        key = str(entity_id)
+        obj = cache.get(key)
+        if obj is None:
+            objs = await fetch(key)
+            obj = objs[0] if objs else None
+            if obj is not None:
+                cache.set(key, obj)
+        return obj
+
+    async def get_album(self, client: yandex_music.ClientAsync, album_id):
+        return await self._get_one(self.albums, client.albums, album_id)
+
+    async def get_artist(self, client: yandex_music.ClientAsync, artist_id):
+        return await self._get_one(self.artists, client.artists, artist_id)
+
+    async def get_playlist(self, client: yandex_music.ClientAsync, playlist_id):
+        return await self._get_one(self.playlists, client.playlists_list, playlist_id)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "tracks": self.tracks.stats,
+            "albums": self.albums.stats,
+            "artists": self.artists.stats,
+            "playlists": self.playlists.stats,
+        }
 
-    def ultra(self) -> io.BytesIO:
-        WIDTH, HEIGHT = 2560, 1220
 
-        def get_font(size):
-            for font_bytes in self.fonts_data:
+BANNER_WIDTH, BANNER_HEIGHT = 2560, 1220
+COVER_SIZE = 500
+COVER_X = (BANNER_WIDTH - COVER_SIZE) // 2
+COVER_Y = 160
+GLOW_SIZE = 620
+GLOW_BLUR = 60
+# Blurs run on buffers downscaled by this factor and are upscaled afterwards
+BLUR_SCALE = 4
+
+CENTER_X = BANNER_WIDTH // 2
+TITLE_Y = COVER_Y + COVER_SIZE + 130
+ARTIST_Y = TITLE_Y + 85
+BAR_Y = ARTIST_Y + 80
+ALBUM_Y = BAR_Y + 80
+META_Y = ALBUM_Y + 60
+ICON_Y = META_Y - 15
+BAR_WIDTH = 800
+BAR_HEIGHT = 6
+BAR_START_X = CENTER_X - BAR_WIDTH // 2
+BAR_END_X = CENTER_X + BAR_WIDTH // 2
+FONT_SIZES = (100, 65, 50, 40, 20)
+# Rows the elapsed time and the progress bar can touch, with a margin; the
+# rest of a banner is the same for every request of a track
+PROGRESS_TOP = BAR_Y - 40
+PROGRESS_BOTTOM = BAR_Y + 40
+
+
+class OutputProfile(typing.NamedTuple):
+    """How a banner is encoded: ``scale`` is an integer downscale factor"""
+
+    format: str = "PNG"
+    quality: int = 85
+    scale: int = 1
+    compress_level: int = 1
+
+    @property
+    def extension(self) -> str:
+        return {"JPEG": "jpg"}.get(self.format, self.format.lower())
+
+
+# Warm render + encode of a 2560x1220 banner: PNG ~20 ms / 900 KB (only the
+# progress rows are encoded), JPEG q90 ~30 ms / 190 KB, WebP q85 ~250 ms /
+# 60 KB, half-size JPEG ~30 ms / 50 KB. Telegram recompresses photos to JPEG
+# anyway.
+OUTPUT_PROFILES = {
+    "png": OutputProfile("PNG", compress_level=1),
+    "jpeg": OutputProfile("JPEG", quality=90),
+    "webp": OutputProfile("WEBP", quality=85),
+    "preview": OutputProfile("JPEG", quality=85, scale=2),
+}
+
+# alpha_composite with an opaque (0, 0, 0, 180) overlay, as a lookup table
+_DARKEN = [round(v * 75 / 255) for v in range(256)] * 3 + list(range(256))
+
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "yamusic")
+FONT_SOURCES = {
+    "Montserrat-Bold": "https://raw.githubusercontent.com/google/fonts/main/ofl/montserrat/Montserrat-Bold.ttf",
+    "Onest-Bold": "https://raw.githubusercontent.com/kamekuro/assets/master/fonts/Onest-Bold.ttf",
+}
+DEFAULT_FONTS = ("Montserrat-Bold", "Onest-Bold")
+
+
+class FontStore:
+    """Banner fonts kept on disk and parsed once per (font, size).
+
+    Missing fonts are downloaded once by ``ensure`` into ``fonts_dir``;
+    rendering only reads that directory and falls back to the next font, then
+    Pillow's default one, when a font isn't there. Failed downloads are
+    retried after ``retry_after`` seconds at the earliest.
+    """
+
+    def __init__(
+        self,
+        fonts_dir: str = os.path.join(CACHE_DIR, "fonts"),
+        retry_after: float = 600.0,
+    ):
+        self.fonts_dir = fonts_dir
+        self.retry_after = retry_after
+        self._data = {}
+        self._fonts = {}
+        self._failed = {}
+        self._default = None
+        self._lock = threading.Lock()
+        self._download_lock = None
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.fonts_dir, f"{name}.ttf")
+
+    def _load_data(self, name: str) -> typing.Optional[bytes]:
+        data = self._data.get(name)
+        if data is None:
+            try:
+                with open(self.path(name), "rb") as f:
+                    data = f.read()
+            except OSError:
+                return None
+            self._data[name] = data
+        return data
+
+    def available(self, names) -> tuple:
+        return tuple(name for name in names if self._load_data(name) is not None)
+
+    def get(self, names, size: int):
+        for name in names:
+            font = self._fonts.get((name, size))
+            if font is None:
+                data = self._load_data(name)
+                if data is None:
+                    continue
                 try:
-                    return ImageFont.truetype(io.BytesIO(font_bytes), size)
-                except Exception:
+                    font = ImageFont.truetype(io.BytesIO(data), size)
+                except Exception as e:
+                    logger.warning(f"Font {name} is unreadable, skipping it: {e}")
                     continue
-            return ImageFont.load_default()
+                with self._lock:
+                    font = self._fonts.setdefault((name, size), font)
+            return font
+        if self._default is None:
+            self._default = ImageFont.load_default()
+        return self._default
+
+    def preload(self, names=DEFAULT_FONTS, sizes=FONT_SIZES):
+        for size in sizes:
+            self.get(names, size)
+
+    async def ensure(self, fetch, names=DEFAULT_FONTS) -> tuple:
+        """Download missing fonts with ``fetch(url) -> bytes | None``"""
+        if len(self.available(names)) == len(names):
+            return tuple(names)
+
+        if self._download_lock is None:
+            self._download_lock = asyncio.Lock()
+        async with self._download_lock:
+            for name in names:
+                if self._load_data(name) is not None or name not in FONT_SOURCES:
+                    continue
+                failed_at = self._failed.get(name)
+                if failed_at and time.monotonic() - failed_at < self.retry_after:
+                    continue
+                await self._download(fetch, name)
+        return self.available(names)
 
+    async def _download(self, fetch, name: str):
         try:
-            original_cover = Image.open(io.BytesIO(self.track_cover)).convert("RGBA")
-        except Exception:
-            original_cover = Image.new("RGBA", (1000, 1000), "black")
+            data = await fetch(FONT_SOURCES[name])
+            if not data:
+                raise RuntimeError("empty response")
+            ImageFont.truetype(io.BytesIO(data), 20)
+
+            os.makedirs(self.fonts_dir, exist_ok=True)
+            # Renamed into place, so a reader never sees half a file
+            partial = self.path(name) + ".part"
+            with open(partial, "wb") as f:
+                f.write(data)
+            os.replace(partial, self.path(name))
+        except Exception as e:
+            self._failed[name] = time.monotonic()
+            logger.warning(f"Failed to download font {name}, using a fallback: {e}")
+            return
+        self._data[name] = data
+        self._failed.pop(name, None)
 
-        dominant_color_img = original_cover.resize((1, 1), Image.Resampling.LANCZOS)
-        dominant_color = dominant_color_img.getpixel((0, 0))
 
-        r, g, b, a = dominant_color
-        brightness = (r * 299 + g * 587 + b * 114) / 1000
-        if brightness < 60:
-            r = min(255, r + 60)
-            g = min(255, g + 60)
-            b = min(255, b + 60)
-            dominant_color = (r, g, b, 255)
+_font_store = FontStore()
 
-        background = original_cover.copy()
-        bg_w, bg_h = background.size
 
-        target_ratio = WIDTH / HEIGHT
-        current_ratio = bg_w / bg_h
+class CoverCache:
+    """Cover images by URL: a memory LRU in front of a size-capped disk store.
 
-        if current_ratio > target_ratio:
-            new_w = int(bg_h * target_ratio)
-            offset = (bg_w - new_w) // 2
-            background = background.crop((offset, 0, offset + new_w, bg_h))
-        else:
-            new_h = int(bg_w / target_ratio)
-            offset = (bg_h - new_h) // 2
-            background = background.crop((0, offset, bg_w, offset + new_h))
+    Files are stored under the hash of their content, so a cover shared by a
+    whole album is kept once, and ``index.json`` maps each URL to its file and
+    its ETag/Last-Modified. Entries older than ``max_age`` seconds are
+    revalidated with a conditional GET; a 304 costs no download, and when the
+    request fails the stale copy is served. The least recently used files
+    are removed once the store grows past ``max_bytes``.
+    """
 
-        background = background.resize((WIDTH, HEIGHT), Image.Resampling.LANCZOS)
-        
-        if self.blur > 0:
-            background = background.filter(ImageFilter.GaussianBlur(radius=self.blur))
+    def __init__(
+        self,
+        cache_dir: str = os.path.join(CACHE_DIR, "covers"),
+        memory_size: int = 32,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age: float = 24 * 3600,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.memory = TTLCache(maxsize=memory_size)
+        self._index = None
+        self._size = 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            try:
+                with open(self._path("index.json")) as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                files = {
+                    entry.name: entry.stat().st_size
+                    for entry in os.scandir(self.cache_dir)
+                    if entry.is_file() and entry.name != "index.json"
+                }
+            except OSError as e:
+                logger.warning(f"Cover cache directory is unavailable: {e}")
+                files = {}
+            self._index = {
+                url: entry for url, entry in index.items() if entry["digest"] in files
+            }
+            self._size = sum(files.values())
+        return self._index
 
-        dark_overlay = Image.new("RGBA", (WIDTH, HEIGHT), (0, 0, 0, 180))
-        background = Image.alpha_composite(background, dark_overlay)
+    def _save_index(self):
+        partial = self._path("index.json.part")
+        try:
+            with open(partial, "w") as f:
+                json.dump(self._index, f)
+            os.replace(partial, self._path("index.json"))
+        except OSError as e:
+            logger.warning(f"Failed to save the cover index: {e}")
 
-        cover_size = 500
-        cover_x = (WIDTH - cover_size) // 2
-        cover_y = 160
+    def _read(self, digest: str) -> typing.Optional[bytes]:
+        try:
+            with open(self._path(digest), "rb") as f:
+                data = f.read()
+            os.utime(self._path(digest))
+        except OSError:
+            return None
+        return data
 
-        glow_layer = Image.new("RGBA", (WIDTH, HEIGHT), (0, 0, 0, 0))
-        draw_glow = ImageDraw.Draw(glow_layer)
+    def _store(self, data: bytes) -> str:
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if not os.path.exists(self._path(digest)):
+            try:
+                with open(self._path(digest) + ".part", "wb") as f:
+                    f.write(data)
+                os.replace(self._path(digest) + ".part", self._path(digest))
+            except OSError as e:
+                # Still served from memory, just not kept across restarts
+                logger.warning(f"Failed to store cover on disk: {e}")
+                return digest
+            self._size += len(data)
+            self._trim(keep=digest)
+        return digest
+
+    def _trim(self, keep: str):
+        if self._size <= self.max_bytes:
+            return
+        files = sorted(
+            (
+                entry
+                for entry in os.scandir(self.cache_dir)
+                if entry.is_file() and entry.name not in ("index.json", keep)
+            ),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        removed = set()
+        for entry in files:
+            if self._size <= self.max_bytes:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self._size -= size
+            removed.add(entry.name)
+        self._index = {
+            url: entry
+            for url, entry in self._index.items()
+            if entry["digest"] not in removed
+        }
 
-        glow_rect_size = 620
-        g_x = (WIDTH - glow_rect_size) // 2
-        g_y = cover_y + (cover_size - glow_rect_size) // 2
+    async def get(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> typing.Optional[typing.Tuple[str, bytes]]:
+        """(content hash, bytes) of the image at ``url``, None if unavailable"""
+        cached = self.memory.get(url)
+        if cached and time.time() - cached[0]["checked"] < self.max_age:
+            return cached[0]["digest"], cached[1]
+
+        index = self._load_index()
+        entry = index.get(url)
+        data = self._read(entry["digest"]) if entry else None
+        if data is not None and time.time() - entry["checked"] < self.max_age:
+            self.memory.set(url, (entry, data))
+            return entry["digest"], data
+
+        headers = {}
+        if data is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            async with session.get(url, headers=headers) as resp:
+                if resp.status == 304 and data is not None:
+                    entry = dict(entry, checked=time.time())
+                elif resp.status == 200:
+                    data = await resp.read()
+                    entry = {
+                        "digest": self._store(data),
+                        "etag": resp.headers.get("ETag"),
+                        "last_modified": resp.headers.get("Last-Modified"),
+                        "checked": time.time(),
+                    }
+                else:
+                    raise RuntimeError(f"HTTP {resp.status}")
+            self._index[url] = entry
+            self._save_index()
+        except Exception as e:
+            logger.warning(f"Failed to fetch cover {url}: {e}")
+            if data is None:
+                return None
 
-        draw_glow.rounded_rectangle(
-            (g_x, g_y, g_x + glow_rect_size, g_y + glow_rect_size),
-            radius=50,
-            fill=dominant_color,
-        )
+        self.memory.set(url, (entry, data))
+        return entry["digest"], data
 
-        glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=60))
-        glow_layer = ImageEnhance.Brightness(glow_layer).enhance(1.4)
-        glow_layer = ImageEnhance.Color(glow_layer).enhance(1.2)
 
-        background = Image.alpha_composite(background, glow_layer)
+_cover_cache = CoverCache()
 
-        cover_img = original_cover.resize(
-            (cover_size, cover_size), Image.Resampling.LANCZOS
-        )
 
-        mask = Image.new("L", (cover_size, cover_size), 0)
-        draw_mask = ImageDraw.Draw(mask)
-        draw_mask.rounded_rectangle((0, 0, cover_size, cover_size), radius=45, fill=255)
+def _backoff(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * 2**attempt))
 
-        background.paste(cover_img, (cover_x, cover_y), mask)
 
-        draw = ImageDraw.Draw(background)
-        center_x = WIDTH // 2
-        current_y = cover_y + cover_size + 130
+class TrackCache:
+    """Downloaded tracks on disk, keyed by (track id, bitrate).
 
-        def draw_text_shadow(text, pos, font, fill="white", anchor="ms"):
-            x, y = pos
-            draw.text(
-                (x + 2, y + 2), text, font=font, fill=(0, 0, 0, 240), anchor=anchor
-            )
-            draw.text((x, y), text, font=font, fill=fill, anchor=anchor)
+    Audio is streamed to a temporary file in ``chunk_size`` pieces and
+    renamed into place, so a track is never held in memory and a failed
+    download leaves nothing behind; the file path is then sent as is and
+    Telethon uploads it from disk. The least recently used tracks are removed
+    once the cache grows past ``max_bytes``. Each download (including the
+    direct link lookup, whose links expire) is retried ``attempts`` times
+    with exponential backoff and jitter, and concurrent requests for the same
+    track share one download.
+    """
 
-        font_title = get_font(100)
-        title_text = self.title
-        if len(title_text) > 30:
-            title_text = title_text[:30] + "..."
-        draw_text_shadow(title_text.upper(), (center_x, current_y), font_title)
+    def __init__(
+        self,
+        cache_dir: str = os.path.join(CACHE_DIR, "tracks"),
+        max_bytes: int = 512 * 1024 * 1024,
+        chunk_size: int = 256 * 1024,
+        attempts: int = 5,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.attempts = attempts
+        self._files = None
+        self._size = 0
+        self._downloads = {}
+
+    @staticmethod
+    def _track_key(track_id) -> str:
+        return str(track_id).split(":")[0]
+
+    def _scan(self) -> OrderedDict:
+        if self._files is None:
+            self._files = OrderedDict()
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                entries = sorted(
+                    (entry for entry in os.scandir(self.cache_dir) if entry.is_file()),
+                    key=lambda entry: entry.stat().st_mtime,
+                )
+            except OSError as e:
+                logger.warning(f"Track cache directory is unavailable: {e}")
+                entries = []
+            for entry in entries:
+                if entry.name.endswith(".part"):
+                    # Left over from an interrupted download
+                    with contextlib.suppress(OSError):
+                        os.remove(entry.path)
+                    continue
+                self._files[entry.name] = entry.stat().st_size
+                self._size += entry.stat().st_size
+        return self._files
+
+    def get(self, track_id) -> typing.Optional[str]:
+        """Path of the best cached copy of a track, if any"""
+        prefix = f"{self._track_key(track_id)}_"
+        cached = [name for name in self._scan() if name.startswith(prefix)]
+        if not cached:
+            return None
+        name = max(cached, key=lambda name: int(name[len(prefix) :].split(".")[0]))
+        path = os.path.join(self.cache_dir, name)
+        try:
+            os.utime(path)
+        except OSError:
+            self._files.pop(name, None)
+            return None
+        self._files.move_to_end(name)
+        return path
 
-        current_y += 85
+    async def fetch(
+        self,
+        session: aiohttp.ClientSession,
+        client: yandex_music.ClientAsync,
+        track_id,
+    ) -> str:
+        """Path of the track on disk, downloading it if it isn't cached"""
+        path = self.get(track_id)
+        if path:
+            return path
+
+        key = self._track_key(track_id)
+        task = self._downloads.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._download(session, client, track_id))
+            self._downloads[key] = task
+            task.add_done_callback(lambda _: self._downloads.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _download(self, session, client, track_id) -> str:
+        for attempt in range(self.attempts):
+            try:
+                info = (
+                    await client.tracks_download_info(track_id, get_direct_links=True)
+                )[0]
+                key = self._track_key(track_id)
+                name = f"{key}_{info.bitrate_in_kbps}.{info.codec}"
+                path = os.path.join(self.cache_dir, name)
+                await self._stream(session, info.direct_link, path)
+            except Exception as e:
+                if attempt == self.attempts - 1:
+                    raise
+                delay = _backoff(attempt)
+                logger.debug(f"Track download failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            size = os.path.getsize(path)
+            self._files[name] = size
+            self._files.move_to_end(name)
+            self._size += size
+            self._trim(keep=name)
+            return path
+
+    async def _stream(self, session: aiohttp.ClientSession, url: str, path: str):
+        partial = f"{path}.{os.getpid()}.part"
+        try:
+            async with session.get(
+                url,
+                timeout=aiohttp.ClientTimeout(
+                    total=None, sock_connect=10, sock_read=30
+                ),
+            ) as resp:
+                resp.raise_for_status()
+                with open(partial, "wb") as f:
+                    async for chunk in resp.content.iter_chunked(self.chunk_size):
+                        f.write(chunk)
+            os.replace(partial, path)
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(partial)
+
+    def _trim(self, keep: str):
+        while self._size > self.max_bytes and len(self._files) > 1:
+            name, size = next(iter(self._files.items()))
+            if name == keep:
+                self._files.move_to_end(name)
+                continue
+            del self._files[name]
+            self._size -= size
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+_track_cache = TrackCache()
+
+
+class LyricsStore:
+    """Track lyrics on disk, zlib-compressed JSON keyed by track id.
+
+    Tracks without lyrics (``NotFoundError``) are remembered as well and only
+    asked about again after ``negative_ttl`` seconds, as lyrics get added
+    later. A failed lyrics download isn't stored. ``prefetch`` fills the
+    store in the background when a new track starts, so ``ylyrics`` usually
+    answers without any request.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = os.path.join(CACHE_DIR, "lyrics"),
+        memory_size: int = 64,
+        negative_ttl: float = 7 * 24 * 3600,
+    ):
+        self.cache_dir = cache_dir
+        self.negative_ttl = negative_ttl
+        self.memory = TTLCache(maxsize=memory_size, ttl=3600)
+        self._fetches = {}
+        self._prefetches = set()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json.z")
+
+    def _read(self, key: str) -> typing.Optional[dict]:
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = json.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, zlib.error):
+            return None
+        if entry.get("missing") and time.time() - entry["checked"] > self.negative_ttl:
+            return None
+        return entry
+
+    def _write(self, key: str, entry: dict):
+        partial = self._path(key) + ".part"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(partial, "wb") as f:
+                f.write(zlib.compress(json.dumps(entry).encode("utf-8")))
+            os.replace(partial, self._path(key))
+        except OSError as e:
+            logger.warning(f"Failed to store lyrics: {e}")
+
+    async def get(
+        self,
+        session: aiohttp.ClientSession,
+        client: yandex_music.ClientAsync,
+        track_id,
+    ) -> typing.Optional[dict]:
+        """{"text", "writers"} of a track, None if it has no lyrics"""
+        key = str(track_id).split(":")[0]
+        entry = self.memory.get(key) or self._read(key)
+        if entry is None:
+            task = self._fetches.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch(session, client, key))
+                self._fetches[key] = task
+                task.add_done_callback(lambda _: self._fetches.pop(key, None))
+            entry = await asyncio.shield(task)
+        if entry.get("missing") or entry.get("text") is not None:
+            self.memory.set(key, entry)
+        return None if entry.get("missing") else entry
+
+    async def _fetch(self, session, client, key: str) -> dict:
+        try:
+            lyrics = await client.tracks_lyrics(key)
+        except yandex_music.exceptions.NotFoundError:
+            entry = {"missing": True, "checked": time.time()}
+            self._write(key, entry)
+            return entry
+
+        text = None
+        if lyrics.download_url:
+            try:
+                async with session.get(lyrics.download_url) as resp:
+                    if resp.status == 200:
+                        text = (await resp.read()).decode("utf-8")
+            except Exception as e:
+                logger.warning(f"Failed to download lyrics of {key}: {e}")
+        entry = {"text": text, "writers": lyrics.writers or []}
+        if text is not None:
+            self._write(key, entry)
+        return entry
+
+    def prefetch(self, session, client, track_id):
+        """Start fetching a track's lyrics in the background"""
+        task = asyncio.ensure_future(self._prefetch(session, client, track_id))
+        self._prefetches.add(task)
+        task.add_done_callback(self._prefetches.discard)
+
+    async def _prefetch(self, session, client, track_id):
+        try:
+            await self.get(session, client, track_id)
+        except Exception as e:
+            logger.debug(f"Lyrics prefetch of {track_id} failed: {e}")
 
-        font_artist = get_font(65)
-        artist_text = ", ".join(self.artists)
-        if len(artist_text) > 45:
-            artist_text = artist_text[:45] + "..."
-        draw_text_shadow(
-            artist_text.upper(),
-            (center_x, current_y),
-            font_artist,
-            fill=(255, 255, 255, 240),
-        )
 
-        current_y += 80
+_lyrics_store = LyricsStore()
 
-        bar_width = 800
-        bar_height = 6
-        font_time = get_font(40)
+# autobio polling, in seconds: playing tracks are re-checked right after they
+# should end but at least this often, since they can be skipped
+AUTOBIO_MAX_INTERVAL = 30
+AUTOBIO_PAUSED_INTERVAL = 60
+AUTOBIO_IDLE_INTERVAL = 120
 
-        bar_start_x = center_x - (bar_width // 2)
-        bar_end_x = center_x + (bar_width // 2)
-        bar_y = current_y
 
-        total_mins = self.duration // 1000 // 60
-        total_secs = (self.duration // 1000) % 60
-        total_time_str = f"{total_mins}:{total_secs:02d}"
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
 
-        cur_mins = self.progress // 1000 // 60
-        cur_secs = (self.progress // 1000) % 60
-        cur_time_str = f"{cur_mins}:{cur_secs:02d}"
 
-        draw_text_shadow(
-            cur_time_str, (bar_start_x - 30, bar_y), font_time, anchor="rm"
+def _format_time(ms: int) -> str:
+    return f"{ms // 1000 // 60}:{(ms // 1000) % 60:02d}"
+
+
+def _encode(image, profile: OutputProfile) -> bytes:
+    if profile.scale > 1:
+        image = image.reduce(profile.scale)
+    out = io.BytesIO()
+    if profile.format == "PNG":
+        image.save(
+            out,
+            format="PNG",
+            compress_level=profile.compress_level,
+            compress_type=zlib.Z_RLE,
         )
-        draw_text_shadow(
-            total_time_str, (bar_end_x + 30, bar_y), font_time, anchor="lm"
+    else:
+        # The banner is opaque, so dropping alpha loses nothing
+        image.convert("RGB").save(out, format=profile.format, quality=profile.quality)
+    return out.getvalue()
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(kind + data)
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+
+def _png_scanlines(image, skip_first: bool = False) -> bytes:
+    """Filtered scanlines of ``image`` as Pillow writes them, uncompressed.
+
+    ``skip_first`` drops the first row, which is only passed in so that the
+    filter of the next one refers to the right pixels.
+    """
+    out = io.BytesIO()
+    image.save(out, format="PNG", compress_level=0)
+    png = out.getvalue()
+    idat = []
+    pos = 8
+    while pos < len(png):
+        (length,) = struct.unpack(">I", png[pos : pos + 4])
+        if png[pos + 4 : pos + 8] == b"IDAT":
+            idat.append(png[pos + 8 : pos + 8 + length])
+        pos += length + 12
+    rows = zlib.decompress(b"".join(idat))
+    if skip_first:
+        rows = rows[len(rows) // image.height :]
+    return rows
+
+
+def _deflate(data: bytes, level: int, final: bool) -> bytes:
+    """Raw deflate segment; segments concatenate into one stream"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15, 9, zlib.Z_RLE)
+    end = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+    return compressor.compress(data) + compressor.flush(end)
+
+
+def _adler32_combine(adler1: int, adler2: int, length2: int) -> int:
+    """Adler-32 of two concatenated blocks from their checksums (zlib's formula)"""
+    base = 65521
+    rem = length2 % base
+    sum1 = adler1 & 0xFFFF
+    sum2 = rem * sum1 % base
+    sum1 = (sum1 + (adler2 & 0xFFFF) + base - 1) % base
+    sum2 = (sum2 + (adler1 >> 16) + (adler2 >> 16) + base - rem) % base
+    return sum1 | (sum2 << 16)
+
+
+def _draw_text_shadow(draw, text, pos, font, fill="white", anchor="ms"):
+    x, y = pos
+    draw.text((x + 2, y + 2), text, font=font, fill=(0, 0, 0, 240), anchor=anchor)
+    draw.text((x, y), text, font=font, fill=fill, anchor=anchor)
+
+
+class BannerRenderer:
+    """Renders the "ultra" banner from cached layers.
+
+    Cover-derived layers (background, glow, rounded cover) are built once per
+    cover, the static text once per track; a request only redraws the elapsed
+    time and the progress bar, and full-size PNGs only re-encode those rows.
+    Blurs run on downscaled buffers. Fonts are read from the font store,
+    never downloaded here.
+    """
+
+    def __init__(
+        self,
+        cover_cache_size: int = 16,
+        frame_cache_size: int = 16,
+        fonts: typing.Optional[FontStore] = None,
+    ):
+        self.covers = TTLCache(maxsize=cover_cache_size)
+        self.frames = TTLCache(maxsize=frame_cache_size)
+        self.png_parts = TTLCache(maxsize=frame_cache_size)
+        self.font_store = fonts or _font_store
+        self._mask = None
+        self._lock = threading.Lock()
+
+    def render(
+        self,
+        title: str,
+        artists: typing.List[str],
+        duration: int,
+        progress: int,
+        track_cover: bytes,
+        fonts: typing.Sequence[str] = DEFAULT_FONTS,
+        album_title: str = "Сингл",
+        meta_info: str = "Music",
+        repeat_mode: str = "NONE",
+        blur: int = 0,
+        profile: str = "jpeg",
+        cover_key: typing.Optional[str] = None,
+    ) -> bytes:
+        cover_key = (cover_key or _digest(track_cover), blur)
+        # A frame drawn with a fallback font is redrawn once the font arrives
+        fonts_key = self.font_store.available(fonts)
+        frame_key = (
+            cover_key,
+            fonts_key,
+            title,
+            tuple(artists),
+            duration,
+            album_title,
+            meta_info,
+            repeat_mode,
         )
 
-        draw.line(
-            [(bar_start_x, bar_y), (bar_end_x, bar_y)],
-            fill=(255, 255, 255, 80),
-            width=bar_height,
+        with self._lock:
+            entry = self.frames.get(frame_key)
+            base = self.covers.get(cover_key) if entry is None else None
+        if entry is None:
+            if base is None:
+                base = self._build_base(track_cover, blur)
+                with self._lock:
+                    self.covers.set(cover_key, base)
+            loaded = self._load_fonts(fonts)
+            frame = self._build_frame(
+                base,
+                loaded,
+                title,
+                artists,
+                duration,
+                album_title,
+                meta_info,
+                repeat_mode,
+            )
+            entry = (frame, loaded[40])
+            with self._lock:
+                self.frames.set(frame_key, entry)
+
+        frame, font_time = entry
+        output = OUTPUT_PROFILES[profile]
+        if output.format == "PNG" and output.scale == 1 and frame.mode == "RGBA":
+            return self._render_png(
+                (frame_key, output), frame, font_time, duration, progress
+            )
+        image = frame.copy()
+        self._draw_progress(ImageDraw.Draw(image), font_time, duration, progress)
+        return _encode(image, output)
+
+    def _render_png(self, key, frame, font_time, duration: int, progress: int):
+        """Full-size PNG that only filters and compresses the progress rows.
+
+        The rows above and below them are compressed once per frame into
+        deflate segments that are joined around the new band.
+        """
+        level = key[1].compress_level
+        with self._lock:
+            parts = self.png_parts.get(key)
+        if parts is None:
+            parts = self._png_parts(frame, level)
+            with self._lock:
+                self.png_parts.set(key, parts)
+        head, top, top_adler, bottom, bottom_adler, bottom_size = parts
+
+        band = frame.crop((0, PROGRESS_TOP - 1, BANNER_WIDTH, PROGRESS_BOTTOM))
+        self._draw_progress(
+            ImageDraw.Draw(band),
+            font_time,
+            duration,
+            progress,
+            bar_y=BAR_Y - PROGRESS_TOP + 1,
+        )
+        rows = _png_scanlines(band, skip_first=True)
+        adler = _adler32_combine(
+            zlib.adler32(rows, top_adler), bottom_adler, bottom_size
         )
+        data = b"".join(
+            (
+                b"\x78\x01",
+                top,
+                _deflate(rows, level, final=False),
+                bottom,
+                struct.pack(">I", adler),
+            )
+        )
+        return head + _png_chunk(b"IDAT", data) + _png_chunk(b"IEND", b"")
+
+    @staticmethod
+    def _png_parts(frame, level: int) -> tuple:
+        width, height = frame.size
+        ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+        head = b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", ihdr)
+        top = _png_scanlines(frame.crop((0, 0, width, PROGRESS_TOP)))
+        bottom = _png_scanlines(
+            frame.crop((0, PROGRESS_BOTTOM - 1, width, height)), skip_first=True
+        )
+        return (
+            head,
+            _deflate(top, level, final=False),
+            zlib.adler32(top),
+            _deflate(bottom, level, final=True),
+            zlib.adler32(bottom),
+            len(bottom),
+        )
+
+    def _load_fonts(self, fonts) -> dict:
+        return {size: self.font_store.get(fonts, size) for size in FONT_SIZES}
 
-        if self.duration > 0:
-            progress_ratio = self.progress / self.duration
+    def _rounded_mask(self):
+        if self._mask is None:
+            mask = Image.new("L", (COVER_SIZE, COVER_SIZE), 0)
+            ImageDraw.Draw(mask).rounded_rectangle(
+                (0, 0, COVER_SIZE, COVER_SIZE), radius=45, fill=255
+            )
+            self._mask = mask
+        return self._mask
+
+    def _build_base(self, track_cover: bytes, blur: int):
+        try:
+            original_cover = Image.open(io.BytesIO(track_cover)).convert("RGBA")
+        except Exception:
+            original_cover = Image.new("RGBA", (1000, 1000), "black")
+
+        dominant_color_img = original_cover.resize((1, 1), Image.Resampling.LANCZOS)
+        r, g, b, a = dominant_color_img.getpixel((0, 0))
+        dominant_color = (r, g, b, a)
+        if (r * 299 + g * 587 + b * 114) / 1000 < 60:
+            dominant_color = (min(255, r + 60), min(255, g + 60), min(255, b + 60), 255)
+
+        bg_w, bg_h = original_cover.size
+        target_ratio = BANNER_WIDTH / BANNER_HEIGHT
+        if bg_w / bg_h > target_ratio:
+            new_w = int(bg_h * target_ratio)
+            offset = (bg_w - new_w) // 2
+            crop_box = (offset, 0, offset + new_w, bg_h)
         else:
-            progress_ratio = 0
-        progress_px = int(bar_width * progress_ratio)
-        if progress_px > bar_width:
-            progress_px = bar_width
+            new_h = int(bg_w / target_ratio)
+            offset = (bg_h - new_h) // 2
+            crop_box = (0, offset, bg_w, offset + new_h)
 
-        draw.line(
-            [(bar_start_x, bar_y), (bar_start_x + progress_px, bar_y)],
-            fill="white",
-            width=bar_height + 5,
-        )
-        draw.ellipse(
+        if blur > 0:
+            small = original_cover.resize(
+                (BANNER_WIDTH // BLUR_SCALE, BANNER_HEIGHT // BLUR_SCALE),
+                Image.Resampling.BOX,
+                box=crop_box,
+            )
+            small = small.filter(ImageFilter.GaussianBlur(radius=blur / BLUR_SCALE))
+            background = small.resize(
+                (BANNER_WIDTH, BANNER_HEIGHT), Image.Resampling.BILINEAR
+            )
+        else:
+            background = original_cover.resize(
+                (BANNER_WIDTH, BANNER_HEIGHT), Image.Resampling.LANCZOS, box=crop_box
+            )
+        background = background.point(_DARKEN)
+
+        # The glow only reaches ~3 sigma past its rectangle, so blur just that region
+        margin = GLOW_BLUR * 3
+        region = GLOW_SIZE + 2 * margin
+        glow_x = (BANNER_WIDTH - GLOW_SIZE) // 2 - margin
+        glow_y = COVER_Y + (COVER_SIZE - GLOW_SIZE) // 2 - margin
+        small_region = region // BLUR_SCALE
+        glow = Image.new("RGBA", (small_region, small_region), (0, 0, 0, 0))
+        ImageDraw.Draw(glow).rounded_rectangle(
             (
-                bar_start_x + progress_px - 10,
-                bar_y - 10,
-                bar_start_x + progress_px + 10,
-                bar_y + 10,
+                margin // BLUR_SCALE,
+                margin // BLUR_SCALE,
+                (margin + GLOW_SIZE) // BLUR_SCALE,
+                (margin + GLOW_SIZE) // BLUR_SCALE,
             ),
-            fill="white",
+            radius=50 // BLUR_SCALE,
+            fill=dominant_color,
         )
+        glow = glow.filter(ImageFilter.GaussianBlur(radius=GLOW_BLUR / BLUR_SCALE))
+        glow = ImageEnhance.Brightness(glow).enhance(1.4)
+        glow = ImageEnhance.Color(glow).enhance(1.2)
+        glow = glow.resize((region, region), Image.Resampling.BILINEAR)
 
-        current_y += 80
+        # The glow box pokes past the top edge: composite only the visible part
+        top = max(0, -glow_y)
+        background.alpha_composite(glow, dest=(glow_x, glow_y + top), source=(0, top))
 
-        font_album = get_font(50)
-        album_text = self.album_title
-        if len(album_text) > 50:
-            album_text = album_text[:50] + "..."
-        draw_text_shadow(
-            album_text, (center_x, current_y), font_album, fill=(230, 230, 230)
+        cover_img = original_cover.resize(
+            (COVER_SIZE, COVER_SIZE), Image.Resampling.LANCZOS
         )
-        current_y += 60
+        background.paste(cover_img, (COVER_X, COVER_Y), self._rounded_mask())
+        return background
+
+    @staticmethod
+    def _build_frame(
+        base,
+        fonts: dict,
+        title: str,
+        artists: typing.List[str],
+        duration: int,
+        album_title: str,
+        meta_info: str,
+        repeat_mode: str,
+    ):
+        frame = base.copy()
+        draw = ImageDraw.Draw(frame)
 
-        font_meta = get_font(40)
+        title_text = title if len(title) <= 30 else title[:30] + "..."
+        _draw_text_shadow(draw, title_text.upper(), (CENTER_X, TITLE_Y), fonts[100])
 
-        draw_text_shadow(
-            self.meta_info, (center_x, current_y), font_meta, fill=(210, 210, 210)
+        artist_text = ", ".join(artists)
+        if len(artist_text) > 45:
+            artist_text = artist_text[:45] + "..."
+        _draw_text_shadow(
+            draw,
+            artist_text.upper(),
+            (CENTER_X, ARTIST_Y),
+            fonts[65],
+            fill=(255, 255, 255, 240),
         )
 
-        icon_y_center = current_y - 15
+        _draw_text_shadow(
+            draw,
+            _format_time(duration),
+            (BAR_END_X + 30, BAR_Y),
+            fonts[40],
+            anchor="lm",
+        )
 
-        if self.repeat_mode != "NONE":
-            rep_x = bar_start_x
-            rep_size = 18
+        album_text = album_title
+        if len(album_text) > 50:
+            album_text = album_text[:50] + "..."
+        _draw_text_shadow(
+            draw, album_text, (CENTER_X, ALBUM_Y), fonts[50], fill=(230, 230, 230)
+        )
+        _draw_text_shadow(
+            draw, meta_info, (CENTER_X, META_Y), fonts[40], fill=(210, 210, 210)
+        )
 
+        if repeat_mode != "NONE":
+            rep_x = BAR_START_X
+            rep_size = 18
             draw.arc(
                 [
                     rep_x - rep_size,
-                    icon_y_center - rep_size,
+                    ICON_Y - rep_size,
                     rep_x + rep_size,
-                    icon_y_center + rep_size,
+                    ICON_Y + rep_size,
                 ],
                 start=40,
                 end=320,
                 fill=(220, 220, 220, 255),
                 width=3,
             )
-
             draw.polygon(
                 [
-                    (rep_x + rep_size - 2, icon_y_center - 8),
-                    (rep_x + rep_size + 8, icon_y_center),
-                    (rep_x + rep_size - 8, icon_y_center + 4),
+                    (rep_x + rep_size - 2, ICON_Y - 8),
+                    (rep_x + rep_size + 8, ICON_Y),
+                    (rep_x + rep_size - 8, ICON_Y + 4),
                 ],
                 fill=(220, 220, 220, 255),
             )
-
-            if self.repeat_mode == "ONE":
-                font_one = get_font(20)
+            if repeat_mode == "ONE":
                 draw.text(
-                    (rep_x + rep_size + 12, icon_y_center),
+                    (rep_x + rep_size + 12, ICON_Y),
                     "1",
-                    font=font_one,
+                    font=fonts[20],
                     fill="white",
                     anchor="lm",
                 )
 
-        heart_x = bar_end_x
-        heart_size = 20
+        return frame
 
-        c_r = heart_size // 2 + 2
+    @staticmethod
+    def _draw_progress(draw, font_time, duration: int, progress: int, bar_y=BAR_Y):
+        _draw_text_shadow(
+            draw,
+            _format_time(progress),
+            (BAR_START_X - 30, bar_y),
+            font_time,
+            anchor="rm",
+        )
 
-        c1_box = (
-            heart_x - c_r * 2,
-            icon_y_center - c_r - 2,
-            heart_x,
-            icon_y_center + c_r - 2,
+        draw.line(
+            [(BAR_START_X, bar_y), (BAR_END_X, bar_y)],
+            fill=(255, 255, 255, 80),
+            width=BAR_HEIGHT,
         )
-        c2_box = (
-            heart_x,
-            icon_y_center - c_r - 2,
-            heart_x + c_r * 2,
-            icon_y_center + c_r - 2,
+
+        progress_ratio = progress / duration if duration > 0 else 0
+        progress_px = min(int(BAR_WIDTH * progress_ratio), BAR_WIDTH)
+        draw.line(
+            [(BAR_START_X, bar_y), (BAR_START_X + progress_px, bar_y)],
+            fill="white",
+            width=BAR_HEIGHT + 5,
+        )
+        draw.ellipse(
+            (
+                BAR_START_X + progress_px - 10,
+                bar_y - 10,
+                BAR_START_X + progress_px + 10,
+                bar_y + 10,
+            ),
+            fill="white",
         )
-        tri_points = [
-            (heart_x - c_r * 2 + 2, icon_y_center + 1),
-            (heart_x + c_r * 2 - 2, icon_y_center + 1),
-            (heart_x, icon_y_center + heart_size + 5),
-        ]
-
-        by = io.BytesIO()
-        background.save(by, format="PNG")
-        by.seek(0)
-        by.name = "banner.png"
+
+
+class Banners:
+    def __init__(
+        self,
+        title: str,
+        artists: list[str],
+        duration: int,
+        progress: int,
+        track_cover: bytes,
+        fonts: typing.Sequence[str] = DEFAULT_FONTS,
+        album_title: str = "Сингл",
+        meta_info: str = "Music",
+        is_liked: bool = False,
+        repeat_mode: str = "NONE",
+        blur: int = 0,
+        profile: str = "jpeg",
+        cover_key: typing.Optional[str] = None,
+    ):
+        self.title = title
+        self.artists = artists
+        self.duration = duration
+        self.progress = progress
+        self.track_cover = track_cover
+        self.fonts = fonts
+        self.album_title = album_title
+        self.meta_info = meta_info
+        self.is_liked = is_liked
+        self.repeat_mode = repeat_mode
+        self.blur = blur
+        self.profile = profile
+        self.cover_key = cover_key
+
+    @property
+    def params(self) -> dict:
+        """Renderer arguments as plain data, so they can be sent to a worker"""
+        return {
+            "title": self.title,
+            "artists": list(self.artists),
+            "duration": self.duration,
+            "progress": self.progress,
+            "track_cover": self.track_cover,
+            "fonts": list(self.fonts),
+            "album_title": self.album_title,
+            "meta_info": self.meta_info,
+            "repeat_mode": self.repeat_mode,
+            "blur": self.blur,
+            "profile": self.profile,
+            "cover_key": self.cover_key,
+        }
+
+    def ultra(self) -> io.BytesIO:
+        by = io.BytesIO(_renderer.render(**self.params))
+        by.name = self.filename
         return by
 
+    @property
+    def filename(self) -> str:
+        return f"banner.{OUTPUT_PROFILES[self.profile].extension}"
+
+
+_renderer = BannerRenderer()
+
+
+def _render_banner(params: dict) -> bytes:
+    return _renderer.render(**params)
+
+
+def _init_render_worker():
+    _font_store.preload()
+
+
+def _ping_render_worker() -> bool:
+    return True
+
+
+class RenderBusy(Exception):
+    """No render slot freed up within the pool's queue timeout"""
+
+
+class RenderPool:
+    """Renders banners in worker processes instead of the event loop's thread.
+
+    Banners for the same cover go to the same worker, so its layer cache stays
+    warm. At most ``max_pending`` jobs run or wait at once; a job that gets no
+    slot within ``queue_timeout`` seconds fails with RenderBusy. A job still
+    running after ``timeout`` seconds has its worker killed and replaced, which
+    frees its slot. Workers are started with forkserver (or spawn), not forked
+    from this threaded process. Where they can't import this module, banners
+    render through utils.run_sync, and a thread keeps its slot until it ends.
+    """
+
+    def __init__(
+        self,
+        workers: typing.Optional[int] = None,
+        max_pending: int = 8,
+        timeout: float = 30.0,
+        queue_timeout: float = 10.0,
+    ):
+        self.workers = workers or max(1, min(2, os.cpu_count() or 1))
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self._pools = []
+        self._slots = None
+        self._start_lock = None
+        self._use_processes = True
+
+    async def render(self, params: dict) -> bytes:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._start_lock = asyncio.Lock()
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise RenderBusy(f"all {self.max_pending} render slots are busy") from None
+        try:
+            index, job = await self._submit(params)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the job is done, not just until the timeout
+        job.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(job), self.timeout)
+        except asyncio.TimeoutError:
+            if index is not None:
+                logger.warning("Banner worker timed out, restarting it")
+                self._restart(index)
+            raise
+
+    async def _submit(self, params: dict) -> tuple:
+        if self._use_processes and not self._pools:
+            await self._start()
+        if self._use_processes:
+            key = params.get("cover_key") or params["track_cover"]
+            index = hash(key) % len(self._pools)
+            try:
+                job = self._pools[index].submit(_render_banner, params)
+                return index, asyncio.wrap_future(job)
+            except BrokenProcessPool as e:
+                logger.warning(f"Banner worker crashed, restarting it: {e}")
+                self._restart(index)
+
+        return None, asyncio.ensure_future(utils.run_sync(_renderer.render, **params))
+
+    async def _start(self):
+        async with self._start_lock:
+            if self._pools or not self._use_processes:
+                return
+            try:
+                # Workers look functions up by reference: this module has to be
+                # importable under its name, here and in a fresh interpreter
+                pickle.dumps(_render_banner)
+                self._pools = [self._new_pool() for _ in range(self.workers)]
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        *(
+                            asyncio.wrap_future(pool.submit(_ping_render_worker))
+                            for pool in self._pools
+                        )
+                    ),
+                    self.timeout,
+                )
+            except Exception as e:
+                logger.warning(f"Banner workers unavailable, using a thread: {e!r}")
+                self._use_processes = False
+                self.shutdown()
+
+    @staticmethod
+    def _new_pool() -> ProcessPoolExecutor:
+        methods = multiprocessing.get_all_start_methods()
+        method = "forkserver" if "forkserver" in methods else "spawn"
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context(method),
+            initializer=_init_render_worker,
+        )
+
+    def _restart(self, index: int):
+        """Kill a pool's worker (failing its jobs) and put a fresh pool in its place"""
+        if index >= len(self._pools):
+            return
+        pool = self._pools[index]
+        for process in list((pool._processes or {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+        self._pools[index] = self._new_pool()
+
+    def _release(self, job: asyncio.Future):
+        self._slots.release()
+        if not job.cancelled():
+            # Retrieved here so a job nobody awaits any more isn't logged
+            job.exception()
+
+    def shutdown(self):
+        pools, self._pools = self._pools, []
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class TokenBucket:
+    """Allows bursts of ``burst`` actions and one more every ``interval`` seconds"""
+
+    def __init__(self, burst: int = 3, interval: float = 30.0):
+        self.burst = burst
+        self.interval = interval
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed / self.interval)
+        self._updated = now
+
+    def take(self) -> bool:
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def wait_time(self) -> float:
+        """Seconds until the next token"""
+        self._refill()
+        return max(0.0, (1 - self._tokens) * self.interval)
+
 
 @loader.tds
 class YaMusicMod(loader.Module):
@@ -314,11 +1394,13 @@ class YaMusicMod(loader.Module):
     strings = {
         "name": "YaMusic",
         "iguide": '📜 <b><a href="https://yandex-music.rtfd.io/en/main/token.html">Guide for obtaining access token for Yandex.Music</a></b>',
+        "render_busy": "⏳ <b>Too many banners are being drawn, try again shortly</b>",
     }
 
     strings_ru = {
         "_cls_doc": "Модуль для стримингового сервиса Яндекс.Музыка",
         "iguide": '📜 <b><a href="https://yandex-music.rtfd.io/en/main/token.html">Гайд по получению токена Яндекс.Музыки</a></b>',
+        "render_busy": "⏳ <b>Сейчас рисуется слишком много баннеров, попробуйте чуть позже</b>",
     }
 
     def __init__(self):
@@ -364,9 +1446,25 @@ class YaMusicMod(loader.Module):
                 option="blur",
                 default=0,
             ),
+            loader.ConfigValue(
+                option="banner_format",
+                default="jpeg",
+                validator=loader.validators.Choice(list(OUTPUT_PROFILES)),
+            ),
         )
 
         self.ym_client = None
+        self._ym_client_token = None
+        self._ym_client_lock = asyncio.Lock()
+        self._search_cache = TTLCache(maxsize=128, ttl=600)
+        self._metadata = MetadataCache()
+        self._render_pool = RenderPool()
+        self._session = None
+        # Last text sent to the profile, so unchanged bios aren't sent again
+        self._bio_text = None
+        self._bio_bucket = TokenBucket()
+        self._entity_names = TTLCache(maxsize=256, ttl=600)
+        self._last_playable_id = None
         self.device_id = "".join(random.choices(string.ascii_lowercase, k=16))
 
     async def client_ready(self, client, db):
@@ -384,9 +1482,25 @@ class YaMusicMod(loader.Module):
             self.set("guide_sent", True)
         me = await self._client.get_me()
         self._premium = me.premium if hasattr(me, "premium") else False
+        # Warm the client up so the first command doesn't pay for init
+        self._ym_warmup = asyncio.ensure_future(self._get_ym_client())
         if self.get("autobio", False):
             self.autobio.start()
 
+    async def on_unload(self):
+        self._render_pool.shutdown()
+        if self._session is not None:
+            await self._session.close()
+
+    def _http(self) -> aiohttp.ClientSession:
+        """Session shared by the module's plain HTTP downloads"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={"User-Agent": "Mozilla/5.0"},
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
+        return self._session
+
     async def _now_play_placeholder(self):
         """Placeholder for {now_play}"""
         if not self.config["token"]:
@@ -405,18 +1519,42 @@ class YaMusicMod(loader.Module):
 
     async def _get_ym_client(self):
         """Lazy initialization of Yandex Music Client to prevent spamming init"""
-        if not self.config["token"]:
+        token = self.config["token"]
+        if not token:
             return None
 
-        if self.ym_client:
+        if self.ym_client and self._ym_client_token == token:
             return self.ym_client
 
+        # Concurrent callers (and the warm-up from client_ready) share one init
+        async with self._ym_client_lock:
+            if self.ym_client and self._ym_client_token == token:
+                return self.ym_client
+            try:
+                self.ym_client = await yandex_music.ClientAsync(token).init()
+                self._ym_client_token = token
+                return self.ym_client
+            except Exception as e:
+                logger.error(f"Failed to init Yandex Music: {e}")
+                return None
+
+    async def _ym_call(self, call):
+        """``await call(client)``; the client is re-initialised on auth errors only"""
+        client = await self._get_ym_client()
         try:
-            self.ym_client = await yandex_music.ClientAsync(self.config["token"]).init()
-            return self.ym_client
-        except Exception as e:
-            logger.error(f"Failed to init Yandex Music: {e}")
-            return None
+            return await call(client)
+        except yandex_music.exceptions.UnauthorizedError:
+            self.ym_client = None
+            client = await self._get_ym_client()
+            if not client:
+                raise
+        except (
+            yandex_music.exceptions.NetworkError,
+            yandex_music.exceptions.TimedOutError,
+        ):
+            # Transient: the client is fine, just try again
+            await asyncio.sleep(_backoff(1))
+        return await call(client)
 
     @loader.loop(1800, autostart=True)
     async def premium_check(self):
@@ -425,6 +1563,13 @@ class YaMusicMod(loader.Module):
 
     @loader.loop(15)
     async def autobio(self):
+        """Updates the bio when its text changes.
+
+        The next run is scheduled just after the current track should end
+        (but within ``AUTOBIO_MAX_INTERVAL``, as tracks get skipped), and less
+        often when paused or idle; updates go through a token bucket to stay
+        clear of FloodWaits.
+        """
         if not self.config["token"]:
             self.autobio.stop()
             self.set("autobio", False)
@@ -435,17 +1580,26 @@ class YaMusicMod(loader.Module):
                 title=now["track"]["title"],
                 performer=", ".join(now["track"]["artist"]),
             )
+            remaining = (now["duration_ms"] - now["progress_ms"]) / 1000
+            interval = min(max(remaining + 1, 3), AUTOBIO_MAX_INTERVAL)
         else:
             out = self.config["no_playing_bio_text"]
-        try:
-            await self._client(
-                telethon.functions.account.UpdateProfileRequest(
-                    about=out[: (140 if self._premium else 70)]
-                )
-            )
-        except telethon.errors.rpcerrorlist.FloodWaitError as e:
-            logger.info(f"Sleeping {max(e.seconds, 60)} because of floodwait")
-            await asyncio.sleep(max(e.seconds, 60))
+            interval = AUTOBIO_PAUSED_INTERVAL if now else AUTOBIO_IDLE_INTERVAL
+        out = out[: (140 if self._premium else 70)]
+
+        if out != self._bio_text:
+            if not self._bio_bucket.take():
+                interval = min(interval, self._bio_bucket.wait_time() + 1)
+            else:
+                try:
+                    await self._client(
+                        telethon.functions.account.UpdateProfileRequest(about=out)
+                    )
+                    self._bio_text = out
+                except telethon.errors.rpcerrorlist.FloodWaitError as e:
+                    interval = max(e.seconds, 60)
+                    logger.info(f"Sleeping {interval} because of floodwait")
+        self.autobio.interval = interval
 
     @loader.command(ru_doc="👉 Гайд по получению токена Яндекс.Музыки", alias="yg")
     async def yguidecmd(self, message: telethon.types.Message):
@@ -464,6 +1618,8 @@ class YaMusicMod(loader.Module):
         bio = not self.get("autobio", False)
         self.set("autobio", bio)
         if bio:
+            # The profile may have been edited meanwhile: always write once
+            self._bio_text = None
             await self.autobio.func(self)
             self.autobio.start()
         else:
@@ -476,6 +1632,7 @@ class YaMusicMod(loader.Module):
                         ]
                     )
                 )
+                self._bio_text = None
             except Exception:
                 pass
 
@@ -497,17 +1654,21 @@ class YaMusicMod(loader.Module):
         if not query:
             return await utils.answer(message, self.strings("errors")["no_query"])
 
-        try:
-            search = await ym_client.search(query, type_="track")
-        except Exception:
-            self.ym_client = None
-            ym_client = await self._get_ym_client()
-            search = await ym_client.search(query, type_="track")
+        key = " ".join(query.casefold().split())
+        track = self._search_cache.get(key)
+        if track is None:
+            search = await self._ym_call(
+                lambda client: client.search(query, type_="track")
+            )
+            results = search.tracks.results if search.tracks else []
+            track = results[0] if results else False
+            # A miss is kept briefly: the catalogue may get the track soon
+            self._search_cache.set(key, track, ttl=None if track else 60)
+            ym_client = self.ym_client or ym_client
 
-        if (not search.tracks) or (len(search.tracks.results) == 0):
+        if not track:
             return await utils.answer(message, self.strings("errors")["not_found"])
 
-        track = search.tracks.results[0]
         out = self.strings("search").format(
             title=track.title,
             performer=", ".join(track.artists_name()),
@@ -515,7 +1676,7 @@ class YaMusicMod(loader.Module):
         )
         await utils.answer(message, out + self.strings("downloading_track"))
 
-        audio = await self.__download_track(ym_client, search.tracks.results[0].id)
+        audio = await self.__download_track(ym_client, track.id)
         await utils.answer(
             message=message,
             response=out,
@@ -523,11 +1684,9 @@ class YaMusicMod(loader.Module):
             attributes=(
                 [
                     telethon.types.DocumentAttributeAudio(
-                        duration=int(search.tracks.results[0].duration_ms / 1000),
-                        title=search.tracks.results[0].title,
-                        performer=", ".join(
-                            [x.name for x in search.tracks.results[0].artists]
-                        ),
+                        duration=int(track.duration_ms / 1000),
+                        title=track.title,
+                        performer=", ".join([x.name for x in track.artists]),
                     )
                 ]
             ),
@@ -617,72 +1776,62 @@ class YaMusicMod(loader.Module):
 
     async def _download_bytes(self, url: str) -> typing.Optional[bytes]:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10
-                ) as resp:
-                    if resp.status == 200:
-                        return await resp.read()
+            async with self._http().get(url) as resp:
+                if resp.status == 200:
+                    return await resp.read()
         except Exception:
             return None
         return None
 
-    @loader.command(
-        ru_doc="👉 Получить баннер трека, который играет сейчас", alias="yn"
-    )
-    async def ynowcmd(self, message: telethon.types.Message):
-        """👉 Get the banner of the track playing right now"""
-        ym_client = await self._get_ym_client()
-        if not ym_client:
-            return await utils.answer(
-                message, self.strings("errors")["no_token_or_invalid"]
-            )
-
-        await utils.answer(message, self.strings("uploading_banner"))
-        now = await self.__get_now_playing()
-
-        if not now or now.get("paused"):
-            return await utils.answer(message, self.strings("errors")["no_playing"])
-
-        try:
-            track_object = (await ym_client.tracks(now["playable_id"]))[0]
-        except Exception:
-            return await utils.answer(message, self.strings("errors")["error"])
+    async def _resolve_entity(
+        self, client: yandex_music.ClientAsync, entity_type: str, entity_id
+    ) -> str:
+        """Link to the queue source ("playing from"), cached by (type, id)"""
+        key = (entity_type, entity_id)
+        name = self._entity_names.get(key)
+        if name is not None:
+            return name
 
+        ttl = None
         try:
-            match now["entity_type"]:
+            match entity_type:
                 case "PLAYLIST":
-                    playlist = (await ym_client.playlists_list(now["entity_id"]))[0]
-                    playlist_name = (
+                    playlist = await self._metadata.get_playlist(client, entity_id)
+                    name = (
                         f'<b><a href ="https://music.yandex.ru/users/'
                         f"{playlist.owner.login}/playlists/{playlist.kind}"
                         f'">{playlist.title}</a></b>'
                     )
                 case "ALBUM":
-                    album = (await ym_client.albums(now["entity_id"]))[0]
-                    playlist_name = (
+                    album = await self._metadata.get_album(client, entity_id)
+                    name = (
                         f'<b><a href ="https://music.yandex.ru/album/'
                         f'{album.id}">{album.title}</a></b>'
                     )
                 case "ARTIST":
-                    artist = (await ym_client.artists(now["entity_id"]))[0]
-                    playlist_name = (
+                    artist = await self._metadata.get_artist(client, entity_id)
+                    name = (
                         f'<b><a href ="https://music.yandex.ru/artist/'
                         f'{artist.id}">{artist.name}</a></b>'
                     )
                 case _:
-                    playlist_name = "Unknown"
+                    name = "Unknown"
         except Exception:
-            playlist_name = "Unknown"
+            # Retried sooner than a resolved name expires
+            name, ttl = "Unknown", 60
+        self._entity_names.set(key, name, ttl=ttl)
+        return name
 
-        if now["entity_type"] not in self.strings("_entity_types").keys():
-            now["entity_type"] = "VARIOUS"
+    def _format_now_playing(self, now: dict, playing_from: str) -> str:
+        entity_type = now["entity_type"]
+        if entity_type not in self.strings("_entity_types").keys():
+            entity_type = "VARIOUS"
 
         device, volume = "Unknown Device", "❔"
         if now["device"]:
             device = now["device"][0]["info"]["title"]
             volume = round(now["device"][0]["volume"] * 100, 2)
-        out = self.config["now_playing_text"].format(
+        return self.config["now_playing_text"].format(
             performer=", ".join(now["track"]["artist"]),
             title=now["track"]["title"],
             device=device,
@@ -690,10 +1839,36 @@ class YaMusicMod(loader.Module):
             track_id=now["track"]["track_id"],
             album_id=now["track"]["album_id"],
             playing_from=self.strings("_entity_types")
-            .get(now["entity_type"])
-            .format(playlist_name),
+            .get(entity_type)
+            .format(playing_from),
             link=f"<a href=\"https://music.yandex.ru/track/{now['playable_id']}\">Яндекс.Музыка</a>",
         )
+
+    @loader.command(
+        ru_doc="👉 Получить баннер трека, который играет сейчас", alias="yn"
+    )
+    async def ynowcmd(self, message: telethon.types.Message):
+        """👉 Get the banner of the track playing right now"""
+        ym_client = await self._get_ym_client()
+        if not ym_client:
+            return await utils.answer(
+                message, self.strings("errors")["no_token_or_invalid"]
+            )
+
+        await utils.answer(message, self.strings("uploading_banner"))
+        now = await self.__get_now_playing()
+
+        if not now or now.get("paused"):
+            return await utils.answer(message, self.strings("errors")["no_playing"])
+
+        track_object = now["track_object"]
+        cover_url = f"https://{track_object.cover_uri[:-2]}1000x1000"
+        playing_from, cover, _ = await asyncio.gather(
+            self._resolve_entity(ym_client, now["entity_type"], now["entity_id"]),
+            _cover_cache.get(self._http(), cover_url),
+            _font_store.ensure(self._download_bytes),
+        )
+        out = self._format_now_playing(now, playing_from)
         try:
             await utils.answer(message, out + self.strings("uploading_banner"))
         except Exception:
@@ -728,20 +1903,7 @@ class YaMusicMod(loader.Module):
 
         repeat_mode = now.get("repeat_mode", "NONE")
 
-        cover_url = f"https://{track_object.cover_uri[:-2]}1000x1000"
-        cover_bytes = await self._download_bytes(cover_url)
-        if not cover_bytes:
-            cover_bytes = b""
-
-        font_urls = [
-            "https://raw.githubusercontent.com/google/fonts/main/ofl/montserrat/Montserrat-Bold.ttf",
-            "https://raw.githubusercontent.com/kamekuro/assets/master/fonts/Onest-Bold.ttf",
-        ]
-        fonts_data = []
-        for f_url in font_urls:
-            fb = await self._download_bytes(f_url)
-            if fb:
-                fonts_data.append(fb)
+        cover_key, cover_bytes = cover or (None, b"")
 
         banners = Banners(
             title=now["track"]["title"],
@@ -749,18 +1911,24 @@ class YaMusicMod(loader.Module):
             duration=now["duration_ms"],
             progress=now["progress_ms"],
             track_cover=cover_bytes,
-            fonts_data=fonts_data,
             album_title=album_title,
             meta_info=meta_info,
             is_liked=is_liked,
             repeat_mode=repeat_mode,
             blur=self.config["blur"],
+            profile=self.config["banner_format"],
+            cover_key=cover_key,
         )
 
 
-        file = await utils.run_sync(
-            getattr(banners, self.config["banner_version"], banners.ultra)
-        )
+        try:
+            file = io.BytesIO(await self._render_pool.render(banners.params))
+        except RenderBusy:
+            return await utils.answer(message, self.strings("render_busy"))
+        except Exception as e:
+            logger.error(f"Banner render failed: {e}")
+            return await utils.answer(message, self.strings("errors")["error"])
+        file.name = banners.filename
         await utils.answer(message=message, response=out, file=file)
 
     @loader.command(ru_doc="👉 Получить трек, который играет сейчас", alias="ynt")
@@ -778,51 +1946,14 @@ class YaMusicMod(loader.Module):
         if not now or now.get("paused"):
             return await utils.answer(message, self.strings("errors")["no_playing"])
 
-        try:
-            match now["entity_type"]:
-                case "PLAYLIST":
-                    playlist = (await ym_client.playlists_list(now["entity_id"]))[0]
-                    playlist_name = (
-                        f'<b><a href ="https://music.yandex.ru/users/'
-                        f"{playlist.owner.login}/playlists/{playlist.kind}"
-                        f'">{playlist.title}</a></b>'
-                    )
-                case "ALBUM":
-                    album = (await ym_client.albums(now["entity_id"]))[0]
-                    playlist_name = (
-                        f'<b><a href ="https://music.yandex.ru/album/'
-                        f'{album.id}">{album.title}</a></b>'
-                    )
-                case "ARTIST":
-                    artist = (await ym_client.artists(now["entity_id"]))[0]
-                    playlist_name = (
-                        f'<b><a href ="https://music.yandex.ru/artist/'
-                        f'{artist.id}">{artist.name}</a></b>'
-                    )
-                case _:
-                    playlist_name = "Unknown"
-        except Exception:
-            playlist_name = "Unknown"
-
-        if now["entity_type"] not in self.strings("_entity_types").keys():
-            now["entity_type"] = "VARIOUS"
-
-        device, volume = "Unknown Device", "❔"
-        if now["device"]:
-            device = now["device"][0]["info"]["title"]
-            volume = round(now["device"][0]["volume"] * 100, 2)
-        out = self.config["now_playing_text"].format(
-            performer=", ".join(now["track"]["artist"]),
-            title=now["track"]["title"],
-            device=device,
-            volume=volume,
-            track_id=now["track"]["track_id"],
-            album_id=now["track"]["album_id"],
-            playing_from=self.strings("_entity_types")
-            .get(now["entity_type"])
-            .format(playlist_name),
-            link=f"<a href=\"https://music.yandex.ru/track/{now['playable_id']}\">Яндекс.Музыка</a>",
+        # The download only needs the track id: run it while the source resolves
+        download = asyncio.ensure_future(
+            self.__download_track(ym_client, now["track"]["track_id"])
         )
+        playing_from = await self._resolve_entity(
+            ym_client, now["entity_type"], now["entity_id"]
+        )
+        out = self._format_now_playing(now, playing_from)
         try:
             await utils.answer(message, out + self.strings("downloading_track"))
         except Exception:
@@ -831,7 +1962,7 @@ class YaMusicMod(loader.Module):
         await utils.answer(
             message=message,
             response=out,
-            file=(await self.__download_track(ym_client, now["track"]["track_id"])),
+            file=(await download),
             attributes=(
                 [
                     telethon.types.DocumentAttributeAudio(
@@ -926,26 +2057,20 @@ class YaMusicMod(loader.Module):
         if not now or now.get("paused"):
             return await utils.answer(message, self.strings("errors")["no_playing"])
 
-        try:
-            lyrics = await ym_client.tracks_lyrics(now["track"]["track_id"])
-
-            lyrics_text = "Error"
-            download_url = lyrics.download_url
-            if download_url:
-                lyrics_bytes = await self._download_bytes(download_url)
-                if lyrics_bytes:
-                    lyrics_text = lyrics_bytes.decode("utf-8")
-
+        lyrics = await _lyrics_store.get(
+            self._http(), ym_client, now["track"]["track_id"]
+        )
+        if lyrics:
             await utils.answer(
                 message,
                 self.strings("lyrics").format(
                     track_id=now["track"]["track_id"],
                     track=f"{', '.join(now['track']['artist'])} — {now['track']['title']}",
-                    text=lyrics_text,
-                    writers=", ".join(lyrics.writers) if lyrics.writers else "Unknown",
+                    text=lyrics["text"] or "Error",
+                    writers=", ".join(lyrics["writers"]) or "Unknown",
                 ),
             )
-        except yandex_music.exceptions.NotFoundError:
+        else:
             await utils.answer(
                 message,
                 self.strings("no_lyrics").format(
@@ -960,23 +2085,19 @@ class YaMusicMod(loader.Module):
         track_id: typing.Union[int, str],
         link_only: bool = False,
     ):
-        last_exception = None
+        if not link_only:
+            return await _track_cache.fetch(self._http(), client, track_id)
+
         for attempt in range(5):
             try:
                 info = await client.tracks_download_info(
                     track_id, get_direct_links=True
                 )
-                if link_only:
-                    return info[0].direct_link
-                by = io.BytesIO(await info[0].download_bytes_async())
-                by.name = "audio.mp3"
-                return by
-            except Exception as e:
-                last_exception = e
-                if attempt != 4:
-                    await asyncio.sleep(1)
-                    continue
-                raise e
+                return info[0].direct_link
+            except Exception:
+                if attempt == 4:
+                    raise
+                await asyncio.sleep(_backoff(attempt))
 
     async def __get_ynison(self):
         async def create_ws(token, ws_proto):
@@ -1089,7 +2210,9 @@ class YaMusicMod(loader.Module):
                 player_state["player_queue"]["current_playable_index"]
             ]
 
-            track_object = (await ym_client.tracks(raw_track["playable_id"]))[0]
+            track_object = await self._metadata.get_track(
+                ym_client, raw_track["playable_id"]
+            )
 
             status = player_state["status"]
             progress_ms = int(status["progress_ms"])
@@ -1101,6 +2224,15 @@ class YaMusicMod(loader.Module):
                 .get("repeat_mode", "NONE")
             )
 
+            if raw_track["playable_id"] != self._last_playable_id:
+                # A new track: have its lyrics ready before anyone asks
+                self._last_playable_id = raw_track["playable_id"]
+                lyrics_info = getattr(track_object, "lyrics_info", None)
+                if lyrics_info is None or lyrics_info.has_available_text_lyrics:
+                    _lyrics_store.prefetch(
+                        self._http(), ym_client, track_object.track_id
+                    )
+
             return (
                 {
                     "track_object": track_object,
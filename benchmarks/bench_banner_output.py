@@ -0,0 +1,55 @@
+"""Encode time and size of a warm banner render per output profile.
+
+Every profile in YaMusic.py's OUTPUT_PROFILES plus a few candidates is timed
+on the same frame (the cached layers are already built, so the numbers are
+the per-request cost: copy, progress bar and encoding). Uses the synthetic
+cover and the YaMusic.py import of bench_banners.py; pass a .ttf path for a
+real font.
+
+    python benchmarks/bench_banner_output.py [font.ttf] [runs]
+"""
+import sys
+import os
+import time
+
+from bench_banners import load_yamusic, make_cover
+
+yamusic = load_yamusic()
+
+CANDIDATES = {
+    "png level 6": yamusic.OutputProfile("PNG", compress_level=6),
+    "jpeg q80": yamusic.OutputProfile("JPEG", quality=80),
+    "webp q75": yamusic.OutputProfile("WEBP", quality=75),
+    "preview png": yamusic.OutputProfile("PNG", scale=2),
+    "preview webp": yamusic.OutputProfile("WEBP", quality=80, scale=2),
+}
+
+
+def main():
+    font_path = sys.argv[1] if len(sys.argv) > 1 else None
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    fonts = (os.path.splitext(os.path.basename(font_path))[0],) if font_path else ()
+    store = yamusic.FontStore(os.path.dirname(os.path.abspath(font_path)) if font_path else "")
+    yamusic.OUTPUT_PROFILES.update(CANDIDATES)
+
+    renderer = yamusic.BannerRenderer(fonts=store)
+    args = dict(
+        title="Never Gonna Give You Up", artists=["Rick Astley"], duration=213000,
+        track_cover=make_cover(), fonts=fonts, album_title="Whenever You Need Somebody",
+        meta_info="1987 • Pop", repeat_mode="ONE", blur=20,
+    )
+    renderer.render(progress=60000, **args)
+
+    print(f"{'profile':<14}{'format':<7}{'size':>11}{'time':>10}{'bytes':>10}")
+    for name, profile in yamusic.OUTPUT_PROFILES.items():
+        best = float("inf")
+        for i in range(runs):
+            start = time.perf_counter()
+            data = renderer.render(progress=61000 + i * 1000, profile=name, **args)
+            best = min(best, time.perf_counter() - start)
+        size = f"{yamusic.BANNER_WIDTH // profile.scale}x{yamusic.BANNER_HEIGHT // profile.scale}"
+        print(f"{name:<14}{profile.format:<7}{size:>11}{best * 1000:8.1f} ms{len(data) / 1024:7.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Per-banner render time of the YaMusic.py "ultra" banner: the previous
+from-scratch renderer vs BannerRenderer with cached layers.
+
+"cold" is the first banner for a cover (layers built), "warm" a repeated
+request for the same track with a different progress (only the time text and
+progress bar are redrawn). Both encode PNG, as the previous renderer did; a
+warm PNG only re-encodes the rows around the progress bar, so warm banners run
+about 50-70x faster on a single-core box. BannerRenderer deflates at level 1,
+so its unblurred banners are ~15% larger than the previous level-6 output.
+The cover is a synthetic 1000x1000 JPEG; pass a .ttf path to render text with
+a real font instead of Pillow's default.
+
+YaMusic.py is a userbot module, so it is imported under a placeholder host
+package; only the renderer is used, which needs none of the host's code.
+
+    python benchmarks/bench_banners.py [font.ttf] [runs]
+"""
+import sys
+import os
+import io
+import time
+import types
+import importlib.util
+
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
+
+YAMUSIC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "YaMusic.py")
+
+
+def load_yamusic():
+    """Import YaMusic.py as ``host.modules.YaMusic`` with a stand-in ``loader``/``utils``"""
+    loader = types.ModuleType("host.loader")
+    loader.tds = lambda cls: cls
+    loader.Module = object
+    loader.command = loader.loop = lambda *args, **kwargs: (lambda func: func)
+    modules = {
+        "host": types.ModuleType("host"),
+        "host.loader": loader,
+        "host.utils": types.ModuleType("host.utils"),
+        "host.modules": types.ModuleType("host.modules"),
+    }
+    modules["host"].__path__ = modules["host.modules"].__path__ = []
+    modules["host"].loader, modules["host"].utils = loader, modules["host.utils"]
+    sys.modules.update(modules)
+    try:
+        import telethon  # noqa: F401
+    except ImportError:
+        telethon = types.ModuleType("telethon")
+        telethon.types = types.SimpleNamespace(Message=object)
+        sys.modules["telethon"] = telethon
+
+    spec = importlib.util.spec_from_file_location("host.modules.YaMusic", YAMUSIC_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_cover() -> bytes:
+    cover = Image.radial_gradient("L").resize((1000, 1000)).convert("RGB")
+    cover = Image.merge("RGB", (cover.getchannel(0), cover.rotate(90).getchannel(0), cover.rotate(45).getchannel(0)))
+    draw = ImageDraw.Draw(cover)
+    for i in range(12):
+        draw.ellipse((60 * i, 40 * i, 60 * i + 300, 40 * i + 300), outline=(255 - 20 * i, 80, 20 * i), width=12)
+    cover = Image.blend(cover, Image.effect_noise((1000, 1000), 25).convert("RGB"), 0.15)
+    out = io.BytesIO()
+    cover.save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+def legacy_ultra(title, artists, duration, progress, track_cover, fonts_data,
+                 album_title, meta_info, repeat_mode, blur) -> bytes:
+    """The previous Banners.ultra: every layer rebuilt at full size, default PNG level"""
+    WIDTH, HEIGHT = 2560, 1220
+
+    def get_font(size):
+        for font_bytes in fonts_data:
+            try:
+                return ImageFont.truetype(io.BytesIO(font_bytes), size)
+            except Exception:
+                continue
+        return ImageFont.load_default()
+
+    original_cover = Image.open(io.BytesIO(track_cover)).convert("RGBA")
+    r, g, b, a = original_cover.resize((1, 1), Image.Resampling.LANCZOS).getpixel((0, 0))
+    dominant_color = (r, g, b, a)
+    if (r * 299 + g * 587 + b * 114) / 1000 < 60:
+        dominant_color = (min(255, r + 60), min(255, g + 60), min(255, b + 60), 255)
+
+    bg_w, bg_h = original_cover.size
+    new_h = int(bg_w / (WIDTH / HEIGHT))
+    offset = (bg_h - new_h) // 2
+    background = original_cover.crop((0, offset, bg_w, offset + new_h)).resize((WIDTH, HEIGHT), Image.Resampling.LANCZOS)
+    if blur > 0:
+        background = background.filter(ImageFilter.GaussianBlur(radius=blur))
+    background = Image.alpha_composite(background, Image.new("RGBA", (WIDTH, HEIGHT), (0, 0, 0, 180)))
+
+    glow_layer = Image.new("RGBA", (WIDTH, HEIGHT), (0, 0, 0, 0))
+    g_x, g_y = (WIDTH - 620) // 2, 160 + (500 - 620) // 2
+    ImageDraw.Draw(glow_layer).rounded_rectangle((g_x, g_y, g_x + 620, g_y + 620), radius=50, fill=dominant_color)
+    glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=60))
+    glow_layer = ImageEnhance.Brightness(glow_layer).enhance(1.4)
+    glow_layer = ImageEnhance.Color(glow_layer).enhance(1.2)
+    background = Image.alpha_composite(background, glow_layer)
+
+    mask = Image.new("L", (500, 500), 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, 500, 500), radius=45, fill=255)
+    background.paste(original_cover.resize((500, 500), Image.Resampling.LANCZOS), ((WIDTH - 500) // 2, 160), mask)
+
+    draw = ImageDraw.Draw(background)
+    center_x, y = WIDTH // 2, 790
+    for text, size, dy in ((title.upper(), 100, 85), (", ".join(artists).upper(), 65, 80)):
+        font = get_font(size)
+        draw.text((center_x + 2, y + 2), text, font=font, fill=(0, 0, 0, 240), anchor="ms")
+        draw.text((center_x, y), text, font=font, fill="white", anchor="ms")
+        y += dy
+    font_time = get_font(40)
+    for text, x, anchor in ((f"{progress // 60000}:{progress // 1000 % 60:02d}", center_x - 430, "rm"),
+                            (f"{duration // 60000}:{duration // 1000 % 60:02d}", center_x + 430, "lm")):
+        draw.text((x + 2, y + 2), text, font=font_time, fill=(0, 0, 0, 240), anchor=anchor)
+        draw.text((x, y), text, font=font_time, fill="white", anchor=anchor)
+    draw.line([(center_x - 400, y), (center_x + 400, y)], fill=(255, 255, 255, 80), width=6)
+    px = int(800 * progress / duration)
+    draw.line([(center_x - 400, y), (center_x - 400 + px, y)], fill="white", width=11)
+    draw.ellipse((center_x - 410 + px, y - 10, center_x - 390 + px, y + 10), fill="white")
+    for text, size, dy in ((album_title, 50, 80), (meta_info, 40, 60)):
+        y += dy
+        font = get_font(size)
+        draw.text((center_x + 2, y + 2), text, font=font, fill=(0, 0, 0, 240), anchor="ms")
+        draw.text((center_x, y), text, font=font, fill=(220, 220, 220), anchor="ms")
+
+    out = io.BytesIO()
+    background.save(out, format="PNG")
+    return out.getvalue()
+
+
+def timed(fn, runs: int):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        data = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, len(data)
+
+
+def main():
+    font_path = sys.argv[1] if len(sys.argv) > 1 else None
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    fonts_data = [open(font_path, "rb").read()] if font_path else []
+    fonts = (os.path.splitext(os.path.basename(font_path))[0],) if font_path else ()
+    yamusic = load_yamusic()
+    store = yamusic.FontStore(os.path.dirname(os.path.abspath(font_path)) if font_path else "")
+    cover = make_cover()
+
+    for blur in (0, 20):
+        args = dict(
+            title="Never Gonna Give You Up", artists=["Rick Astley"], duration=213000,
+            track_cover=cover, album_title="Whenever You Need Somebody",
+            meta_info="1987 • Pop", repeat_mode="ONE", blur=blur,
+        )
+        legacy, legacy_size = timed(lambda: legacy_ultra(progress=60000, fonts_data=fonts_data, **args), runs)
+
+        def cold():
+            return yamusic.BannerRenderer(fonts=store).render(progress=60000, fonts=fonts, profile="png", **args)
+        cold_time, _ = timed(cold, runs)
+
+        renderer = yamusic.BannerRenderer(fonts=store)
+        renderer.render(progress=60000, fonts=fonts, profile="png", **args)
+        progress = iter(range(61000, 10**9, 1000))
+        warm, size = timed(lambda: renderer.render(progress=next(progress), fonts=fonts, profile="png", **args), runs)
+
+        print(f"blur={blur:<3} legacy {legacy * 1000:7.1f} ms ({legacy_size / 1024:5.0f} KB)  "
+              f"cold {cold_time * 1000:7.1f} ms  warm {warm * 1000:7.1f} ms ({size / 1024:5.0f} KB)  "
+              f"speedup {legacy / warm:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Per-update overhead of the pre-dispatch middlewares.
+
+"stacked" mirrors the previous setup (logging/ban, cooldown and anti-flood
+middlewares chained separately, each doing its own isinstance checks, time
+calls and lookups, plus locale resolution); "fused" is PreDispatchMiddleware.
+The handler is a no-op and rate limits are set so nothing gets rejected.
+
+    python benchmarks/bench_middleware.py [updates]
+"""
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import functools
+from datetime import datetime
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the global UserLogger database out of the working tree
+os.chdir(tempfile.mkdtemp())
+
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import Message, InlineQuery, CallbackQuery, Chat, User
+
+from middlewares.pipeline import PreDispatchMiddleware
+from utils.user_logger import user_logger
+from utils.log_writer import log_writer
+from utils.language_manager import language_manager
+from utils.rate_limiter import RateLimiter, RateLimit
+
+NO_LIMIT = RateLimit("bench", cost=0)
+
+
+async def legacy_logging(handler, event, data):
+    if isinstance(event, Message):
+        user = event.from_user
+        text = event.text or event.caption
+        command = text.split()[0] if text and text.startswith('/') else None
+        log_writer.enqueue(user.id, user.username, user.first_name, user.last_name, command, text, event.chat.type)
+        if user_logger.is_user_banned(user.id):
+            return
+    elif isinstance(event, CallbackQuery):
+        user = event.from_user
+        log_writer.enqueue(user.id, user.username, user.first_name, user.last_name, "callback", event.data, "callback")
+        if user_logger.is_user_banned(user.id):
+            return
+    elif isinstance(event, InlineQuery):
+        user = event.from_user
+        log_writer.enqueue(user.id, user.username, user.first_name, user.last_name, "inline", event.query, "inline")
+        if user_logger.is_user_banned(user.id):
+            return
+    return await handler(event, data)
+
+
+pm_cooldown = {}
+inline_cooldown = {}
+
+
+async def legacy_cooldown(handler, event, data):
+    current_time = time.time()
+    if isinstance(event, Message):
+        if event.chat.type == "private" and event.text and event.text.startswith('/'):
+            if current_time - pm_cooldown.get(event.from_user.id, 0) < 0:
+                return
+            pm_cooldown[event.from_user.id] = current_time
+    elif isinstance(event, InlineQuery):
+        if current_time - inline_cooldown.get(event.from_user.id, 0) < 0:
+            return
+        inline_cooldown[event.from_user.id] = current_time
+    return await handler(event, data)
+
+
+limiters = {}
+
+
+async def legacy_antiflood(handler, event, data):
+    profile = get_flag(data, "rate_limit")
+    limiter = limiters.get(profile.name) or limiters.setdefault(profile.name, RateLimiter(profile.interval, profile.burst))
+    if limiter.hit(event.from_user.id, profile.cost):
+        return
+    return await handler(event, data)
+
+
+async def legacy_locale(handler, event, data):
+    user = getattr(event, "from_user", None)
+    data["locale"] = language_manager.resolve_locale(user.id if user else None)
+    return await handler(event, data)
+
+
+async def noop_handler(event, data):
+    return None
+
+
+def chain(middlewares):
+    handler = noop_handler
+    for middleware in reversed(middlewares):
+        handler = functools.partial(middleware, handler)
+    return handler
+
+
+def make_events(count: int):
+    chat = Chat(id=1, type="private")
+    return [
+        Message(
+            message_id=i, date=datetime.now(), chat=chat, text="/help",
+            from_user=User(id=i, is_bot=False, first_name="User"),
+        )
+        for i in range(count)
+    ]
+
+
+async def run(name: str, entry, events, updates: int):
+    handler_obj = SimpleNamespace(flags={"rate_limit": NO_LIMIT})
+    start = time.perf_counter()
+    for i in range(updates):
+        await entry(events[i % len(events)], {"handler": handler_obj})
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} {elapsed * 1e6 / updates:6.2f} us/update")
+
+
+async def main():
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    events = make_events(1000)
+    log_writer.dropped = 0
+
+    stacked = chain([legacy_logging, legacy_cooldown, legacy_antiflood, legacy_locale])
+    fused = functools.partial(PreDispatchMiddleware(), noop_handler)
+
+    # Warm the settings cache so both variants measure the steady state
+    await run("warmup", fused, events, len(events))
+    for _ in range(2):
+        await run("stacked", stacked, events, updates)
+        await run("fused", fused, events, updates)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""Memory of the per-user rate limiter under a stream of distinct user ids.
+
+Feeds N distinct ids (default one million) at a simulated 5k new users per
+second and prints tracked entries and process RSS every 10%. The old
+unbounded dict is run afterwards for comparison.
+
+    python benchmarks/bench_rate_limiter.py [users]
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.rate_limiter import RateLimiter
+
+USERS_PER_SECOND = 5_000
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(name: str, users: int, check):
+    step = max(1, users // 10)
+    start = time.perf_counter()
+    for user_id in range(users):
+        size = check(user_id, user_id / USERS_PER_SECOND)
+        if (user_id + 1) % step == 0:
+            print(f"{name:<8} {user_id + 1:>9} ids  {size:>9} entries  {rss_mb():8.1f} MB RSS")
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} {elapsed * 1e9 / users:.0f} ns/check\n")
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    limiter = RateLimiter(interval=5.0, max_entries=50_000)
+
+    def bounded(user_id, now):
+        limiter.hit(user_id, now=now)
+        return len(limiter)
+
+    storage = {}
+
+    def unbounded(user_id, now):
+        last = storage.get(user_id)
+        if last is None or now - last >= 5.0:
+            storage[user_id] = now
+        return len(storage)
+
+    run("limiter", users, bounded)
+    run("dict", users, unbounded)
+
+
+if __name__ == "__main__":
+    main()
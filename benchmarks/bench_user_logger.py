@@ -0,0 +1,97 @@
+"""Updates per second through the UserLogger database path.
+
+One simulated update is what the middlewares and a typical handler did before
+the ban index and settings cache: log the interaction, check the ban list and
+look the language up three times. "legacy" reproduces the old connect-per-call
+pattern, "pooled" runs the same queries through utils.storage.Storage
+directly, so the numbers compare connection handling only (UserLogger itself
+now answers the ban and language lookups from memory).
+
+    python benchmarks/bench_user_logger.py [updates]
+"""
+import sys
+import os
+import time
+import sqlite3
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.storage import Storage
+from utils.user_logger import UserLogger
+
+
+class LegacyUserLogger:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def log_user_interaction(self, user_id, username, first_name, last_name, command, message_text, chat_type):
+        db = sqlite3.connect(self.db_path)
+        db.execute("""
+            INSERT INTO user_logs
+            (user_id, username, first_name, last_name, command, message_text, chat_type)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (user_id, username, first_name, last_name, command, message_text, chat_type))
+        db.commit()
+        db.close()
+
+    def is_user_banned(self, user_id):
+        db = sqlite3.connect(self.db_path)
+        result = db.execute("SELECT 1 FROM banned_users WHERE user_id = ?", (user_id,)).fetchone()
+        db.close()
+        return result is not None
+
+    def get_user_language(self, user_id):
+        db = sqlite3.connect(self.db_path)
+        result = db.execute("SELECT language FROM user_settings WHERE user_id = ?", (user_id,)).fetchone()
+        db.close()
+        return result[0] if result else "en"
+
+
+class PooledUserLogger:
+    def __init__(self, storage: Storage):
+        self.storage = storage
+
+    def log_user_interaction(self, user_id, username, first_name, last_name, command, message_text, chat_type):
+        self.storage.execute("""
+            INSERT INTO user_logs
+            (user_id, username, first_name, last_name, command, message_text, chat_type)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (user_id, username, first_name, last_name, command, message_text, chat_type))
+
+    def is_user_banned(self, user_id):
+        return self.storage.fetchone("SELECT 1 FROM banned_users WHERE user_id = ?", (user_id,)) is not None
+
+    def get_user_language(self, user_id):
+        result = self.storage.fetchone("SELECT language FROM user_settings WHERE user_id = ?", (user_id,))
+        return result[0] if result else "en"
+
+
+def simulate_update(logger, user_id: int):
+    logger.log_user_interaction(user_id, "user", "First", None, "/help", "/help", "private")
+    logger.is_user_banned(user_id)
+    for _ in range(3):
+        logger.get_user_language(user_id)
+
+
+def run(name: str, logger, updates: int):
+    start = time.perf_counter()
+    for i in range(updates):
+        simulate_update(logger, i % 500)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} {updates / elapsed:>10.0f} updates/s  ({elapsed * 1e6 / updates:.0f} us/update)")
+
+
+def main():
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # Creates the schema
+        UserLogger(db_path).storage.close()
+        storage = Storage(db_path)
+        run("legacy", LegacyUserLogger(db_path), updates)
+        run("pooled", PooledUserLogger(storage), updates)
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,11 @@ from aiogram.filters import Command, CommandObject
 from aiogram.types import CallbackQuery
 from utils.user_logger import user_logger
 from utils.language_manager import language_manager
+from utils.log_writer import log_writer
+from utils.keyboards import keyboard_cache
+from utils.music_cache import music_cache
+from handlers.yamusic import clients as yamusic_clients
+from utils.file_id_cache import file_id_cache
 
 router = Router()
 ADMIN_ID = 8509052775  # Admin ID - you can change this
@@ -143,6 +148,33 @@ async def cmd_userinfo(message: types.Message, command: CommandObject):
     except Exception as e:
         await message.answer(f"❌ Error getting user info: {str(e)}")
 
+@router.message(Command("stats"), F.from_user.id == ADMIN_ID)
+async def cmd_stats(message: types.Message):
+    """Show runtime metrics of the bot's background services"""
+    logs = log_writer.metrics
+    settings_cache = user_logger.settings_cache.stats
+    
+    text = f"📊 {html.bold('Runtime Stats')}\n"
+    text += "─" * 25 + "\n"
+    text += f"📝 {html.bold('Log writer:')}\n"
+    text += f"Queue: {logs['queue_depth']}/{logs['queue_max']}\n"
+    text += f"Written: {logs['written']} in {logs['batches']} batches\n"
+    text += f"Dropped: {logs['dropped']} | Failed: {logs['failed']}\n"
+    text += f"⚙️ {html.bold('Settings cache:')}\n"
+    text += f"Size: {settings_cache['size']}/{settings_cache['maxsize']}\n"
+    text += f"Hits: {settings_cache['hits']} | Misses: {settings_cache['misses']} ({settings_cache['hit_rate']:.0%})\n"
+    text += f"⌨️ {html.bold('Keyboards:')} {len(keyboard_cache)} cached, {keyboard_cache.hits} reused\n"
+    ym = yamusic_clients.stats
+    text += f"🎧 {html.bold('YaMusic clients:')} {ym['clients']}/{ym['maxsize']} resident\n"
+    text += f"Reused: {ym['hits']} | Created: {ym['created']} | Evicted: {ym['evicted']} | No token: {ym['no_token']}\n"
+    files = file_id_cache.stats
+    text += f"📎 {html.bold('Uploaded file_ids:')} {files['hits']} reused, {files['misses']} missed ({files['hit_rate']:.0%})\n"
+    text += f"🎵 {html.bold('Music metadata:')}\n"
+    for kind, stats in music_cache.stats.items():
+        text += f"{kind.capitalize()}: {stats['size']}/{stats['maxsize']}, {stats['hit_rate']:.0%} hits\n"
+    
+    await message.answer(text, parse_mode="HTML")
+
 # Admin panel callback handler
 @router.callback_query(F.data.startswith("admin_"), F.from_user.id == ADMIN_ID)
 async def handle_admin_callbacks(callback: CallbackQuery):
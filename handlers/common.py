@@ -4,26 +4,27 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from aiogram import Router, types, html, F
 from aiogram.filters import Command
+from utils.rate_limiter import LIGHT
 from utils.language_manager import language_manager
 
 router = Router()
 
-@router.message(Command("start"), F.chat.type == "private")
-async def cmd_start(message: types.Message):
+@router.message(Command("start"), F.chat.type == "private", flags={"rate_limit": LIGHT})
+async def cmd_start(message: types.Message, locale: str):
     # Works ONLY in private chat with bot
     text = language_manager.get_text(
         'start', 
-        message.from_user.id,
+        locale=locale,
         name=html.bold(message.from_user.first_name or "User")
     )
     await message.answer(text, parse_mode="HTML")
 
-@router.message(Command("help"))
-async def cmd_help(message: types.Message):
+@router.message(Command("help"), flags={"rate_limit": LIGHT})
+async def cmd_help(message: types.Message, locale: str):
     bot_info = await message.bot.get_me()
     help_text = language_manager.get_text(
         'help',
-        message.from_user.id,
+        locale=locale,
         bold=html.bold,
         italic=html.italic,
         username=bot_info.username
@@ -11,7 +11,7 @@ router = Router()
 ADMIN_ID = YOUR_TELEGRAM_ID  # Admin ID
 
 @router.message(F.chat.type == "private", ~F.text.startswith('/'))
-async def feedback_handler(message: types.Message, bot: Bot):
+async def feedback_handler(message: types.Message, bot: Bot, locale: str):
     """Handle feedback messages - ignores commands, only processes regular messages"""
     
     # Ignore admins (they don't need feedback forwarding)
@@ -32,18 +32,18 @@ async def feedback_handler(message: types.Message, bot: Bot):
         # Forward to admin
         await bot.send_message(
             ADMIN_ID,
-            f"📩 {language_manager.get_text('message', message.from_user.id, bold=lambda x: f'<b>{x}</b>')}!\n"
+            f"📩 {language_manager.get_text('message', locale=locale, bold=lambda x: f'<b>{x}</b>')}!\n"
             f"From: {user_info} (ID: <code>{message.from_user.id}</code>)\n\n"
             f"{message_content}",
             parse_mode="HTML"
         )
         
         # Send confirmation to user
-        confirmation_text = language_manager.get_text('message_delivered', message.from_user.id)
+        confirmation_text = language_manager.get_text('message_delivered', locale=locale)
         await message.answer(confirmation_text)
         
     except Exception as e:
         print(f"Error sending feedback: {e}")
         # Optionally notify user about the error
-        error_text = language_manager.get_text('error', message.from_user.id)
+        error_text = language_manager.get_text('error', locale=locale)
         await message.answer(error_text)
@@ -1,11 +1,16 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import hashlib
 import translators as ts
 from aiogram import Router, F
 from aiogram.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+from utils.rate_limiter import INLINE_HEAVY
 
 router = Router()
 
-@router.inline_query(F.query.startswith("tr"))
+@router.inline_query(F.query.startswith("tr"), flags={"rate_limit": INLINE_HEAVY})
 async def inline_translate(inline_query: InlineQuery):
     # Убираем префикс "tr" и пробелы
     query_text = inline_query.query[2:].strip()
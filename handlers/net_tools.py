@@ -5,14 +5,15 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from aiogram import Router, types, html, F
 from aiogram.filters import Command, CommandObject
+from utils.rate_limiter import HEAVY
 from utils.language_manager import language_manager
 
 router = Router()
 
-@router.message(Command("whois"))
-async def cmd_whois_sys(message: types.Message, command: CommandObject):
+@router.message(Command("whois"), flags={"rate_limit": HEAVY})
+async def cmd_whois_sys(message: types.Message, command: CommandObject, locale: str):
     if not command.args:
-        error_text = language_manager.get_text('error', message.from_user.id)
+        error_text = language_manager.get_text('error', locale=locale)
         return await message.answer(f"{error_text}: Please provide domain/IP: `/whois 8.8.8.8`")
 
     target = command.args.strip()
@@ -38,17 +39,17 @@ async def cmd_whois_sys(message: types.Message, command: CommandObject):
     else:
         result_text = html.code("\n".join(important_info))
 
-    whois_text = language_manager.get_text('whois_info', message.from_user.id)
+    whois_text = language_manager.get_text('whois_info', locale=locale)
     await message.answer(f"🔍 {html.bold(whois_text + ' ' + target + ':')}\n\n{result_text}", parse_mode="HTML")
 
-@router.message(Command("status"))
-async def cmd_status(message: types.Message, command: CommandObject):
+@router.message(Command("status"), flags={"rate_limit": HEAVY})
+async def cmd_status(message: types.Message, command: CommandObject, locale: str):
     if not command.args:
-        error_text = language_manager.get_text('error', message.from_user.id)
+        error_text = language_manager.get_text('error', locale=locale)
         return await message.answer(f"{error_text}: Please provide domain/IP: `/status example.com`")
 
     target = command.args.strip()
-    checking_text = language_manager.get_text('status_checking', message.from_user.id)
+    checking_text = language_manager.get_text('status_checking', locale=locale)
     await message.answer(f"{checking_text} {target}...")
     
     # Simple ping/trace to check status
@@ -65,10 +66,10 @@ async def cmd_status(message: types.Message, command: CommandObject):
         lines = output.splitlines()
         
         # Extract useful information
-        result_text = "✅ " + language_manager.get_text('success', message.from_user.id) + "\n"
+        result_text = "✅ " + language_manager.get_text('success', locale=locale) + "\n"
         result_text += html.code(output[:300] + "..." if len(output) > 300 else output)
     else:
-        error_text = language_manager.get_text('not_found', message.from_user.id)
+        error_text = language_manager.get_text('not_found', locale=locale)
         result_text = f"❌ {error_text}\n" + html.code(stderr.decode(errors='ignore')[:200])
 
     await message.answer(result_text, parse_mode="HTML")
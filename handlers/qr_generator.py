@@ -4,19 +4,29 @@ import uuid
 import io
 import sys
 import os
+import logging
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from aiogram import Router, types, html, F
 from aiogram.filters import Command, CommandObject
 from aiogram.types import BufferedInputFile, InlineQueryResultCachedPhoto
+from aiogram.exceptions import TelegramBadRequest
+from utils.file_id_cache import file_id_cache
+from utils.rate_limiter import INLINE_HEAVY
 from utils.language_manager import language_manager
 
 router = Router()
+logger = logging.getLogger(__name__)
+
+DUMP_CHANNEL_ID = -1003674095314  # Change this to your channel ID
+
+# Parts of the errors Telegram returns for a file_id it no longer accepts
+STALE_FILE_ID_ERRORS = ("file identifier", "file_reference")
 
 @router.message(Command("qr"))
-async def cmd_qr(message: types.Message, command: CommandObject):
+async def cmd_qr(message: types.Message, command: CommandObject, locale: str):
     if not command.args:
-        error_text = language_manager.get_text('error', message.from_user.id)
+        error_text = language_manager.get_text('error', locale=locale)
         return await message.answer(f"⚠️ {error_text}: Please provide text or link for QR code: `/qr Hello World`", parse_mode="Markdown")
 
     data_to_encode = command.args
@@ -35,42 +45,47 @@ async def cmd_qr(message: types.Message, command: CommandObject):
     
     try:
         # Use types.FSInputFile and pass PATH to file, not open object
-        success_text = language_manager.get_text('qr_created', message.from_user.id)
+        success_text = language_manager.get_text('qr_created', locale=locale)
         await message.answer_photo(
             photo=types.FSInputFile(temp_file_path), 
             caption=f"✅ {success_text}: {html.code(data_to_encode[:50]) + ('...' if len(data_to_encode) > 50 else '')}",
             parse_mode="HTML"
         )
     except Exception as e:
-        error_text = language_manager.get_text('error', message.from_user.id)
+        error_text = language_manager.get_text('error', locale=locale)
         await message.answer(f"❌ {error_text}: {e}")
     finally:
         # Always delete temporary file
         if os.path.exists(temp_file_path):
             os.remove(temp_file_path)
 
-@router.inline_query(F.query.startswith("qr "))
+@router.inline_query(F.query.startswith("qr "), flags={"rate_limit": INLINE_HEAVY})
 async def inline_qr_gen(inline_query: types.InlineQuery):
     data = inline_query.query[3:].strip()
     if not data:
         return
 
-    # Generate QR code
-    qr = qrcode.make(data)
-    bio = io.BytesIO()
-    qr.save(bio, format="PNG")
-    bio.seek(0)
-    file_bytes = bio.read()
+    # The same text always gives the same image: reuse its file_id if it was uploaded before
+    key = file_id_cache.make_key("qr", data)
+    file_id = file_id_cache.get(key)
+    cached = file_id is not None
 
-    # Send to dump channel to get file_id
-    DUMP_CHANNEL_ID = -1003674095314  # Change this to your channel ID
-    
     try:
-        temp_msg = await inline_query.bot.send_photo(
-            chat_id=DUMP_CHANNEL_ID,
-            photo=BufferedInputFile(file_bytes, filename="qr.png")
-        )
-        file_id = temp_msg.photo[-1].file_id
+        if file_id is None:
+            # Generate QR code
+            qr = qrcode.make(data)
+            bio = io.BytesIO()
+            qr.save(bio, format="PNG")
+            bio.seek(0)
+            file_bytes = bio.read()
+
+            # Send to dump channel to get file_id
+            temp_msg = await inline_query.bot.send_photo(
+                chat_id=DUMP_CHANNEL_ID,
+                photo=BufferedInputFile(file_bytes, filename="qr.png")
+            )
+            file_id = temp_msg.photo[-1].file_id
+            file_id_cache.set(key, file_id)
         
         # Return result via cached photo
         await inline_query.answer([
@@ -81,5 +96,10 @@ async def inline_qr_gen(inline_query: types.InlineQuery):
             )
         ], is_personal=True, cache_time=60)
         
+    except TelegramBadRequest as e:
+        if cached and any(part in e.message.lower() for part in STALE_FILE_ID_ERRORS):
+            # A stored file_id Telegram no longer accepts: upload again next time
+            file_id_cache.delete(key)
+        logger.error(f"Dump channel error: {e}")
     except Exception as e:
-        print(f"Dump channel error: {e}")  # Falls here if bot is not admin in channel
+        logger.error(f"Dump channel error: {e}")  # Falls here if bot is not admin in channel
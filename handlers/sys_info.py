@@ -44,12 +44,12 @@ def get_server_info():
     }
 
 @router.message(Command("server"), F.from_user.id == ADMIN_ID)
-async def cmd_server(message: types.Message):
+async def cmd_server(message: types.Message, locale: str):
     """Admin-only server information command"""
     info = get_server_info()
     
     text = (
-        f"🖥 {html.bold(language_manager.get_text('server_info', message.from_user.id))}\n"
+        f"🖥 {html.bold(language_manager.get_text('server_info', locale=locale))}\n"
         f"{'─' * 20}\n"
         f"⚙️ {html.bold('OS:')} {info['os']}\n"
         f"⌛ {html.bold('Uptime:')} {info['uptime']}\n\n"
@@ -61,12 +61,12 @@ async def cmd_server(message: types.Message):
     await message.answer(text, parse_mode="HTML")
 
 @router.inline_query(F.query.startswith("sys"), F.from_user.id == ADMIN_ID)
-async def inline_server_info(inline_query: types.InlineQuery):
+async def inline_server_info(inline_query: types.InlineQuery, locale: str):
     """Admin-only inline server information"""
     info = get_server_info()
 
     text = (
-        f"🖥 {html.bold(language_manager.get_text('server_info', inline_query.from_user.id))}\n"
+        f"🖥 {html.bold(language_manager.get_text('server_info', locale=locale))}\n"
         f"{'─' * 20}\n"
         f"⚙️ {html.bold('OS:')} {info['os']}\n"
         f"⌛ {html.bold('Uptime:')} {info['uptime']}\n\n"
@@ -1,6 +1,5 @@
 import uuid
 import time
-import aiohttp
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -8,48 +7,49 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from aiogram import Router, types, F
 from aiogram.filters import Command, CommandObject
 from aiogram import html
+from utils.rate_limiter import HEAVY, INLINE_HEAVY
 from utils.language_manager import language_manager
+from utils.http_client import http_client
 
 router = Router()
 
-@router.message(Command("status"))
-async def cmd_status(message: types.Message, command: CommandObject):
+@router.message(Command("status"), flags={"rate_limit": HEAVY})
+async def cmd_status(message: types.Message, command: CommandObject, locale: str):
     if not command.args:
-        error_text = language_manager.get_text('error', message.from_user.id)
+        error_text = language_manager.get_text('error', locale=locale)
         return await message.answer(f"⚠️ {error_text}: Please provide domain, e.g.: `/status google.com`", parse_mode="Markdown")
 
     url = command.args.strip()
     if not url.startswith(('http://', 'https://')):
         url = f'http://{url}'
 
-    checking_text = language_manager.get_text('status_checking', message.from_user.id)
+    checking_text = language_manager.get_text('status_checking', locale=locale)
     sent_message = await message.answer(f"{checking_text} {html.bold(url)}...")
     
     start_time = time.monotonic()
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=10) as response:
-                # Calculate response time in ms
-                ping_ms = round((time.monotonic() - start_time) * 1000)
-                
-                status_code = response.status
-                server = response.headers.get('Server', 'Unknown')
-                
-                # Choose emoji based on response code
-                icon = "✅" if response.ok else "⚠️"
-                
-                result_text = language_manager.get_text('success', message.from_user.id)
-                text = (
-                    f"{icon} {html.bold('Check Result:')}\n"
-                    f"{'─' * 20}\n"
-                    f"🌐 {html.bold('URL:')} {url}\n"
-                    f"📊 {html.bold('Status:')} {status_code}\n"
-                    f"⚡ {html.bold('Ping:')} {ping_ms} ms\n"
-                    f"🖥 {html.bold('Server:')} {server}"
-                )
+        async with http_client.get(url) as response:
+            # Calculate response time in ms
+            ping_ms = round((time.monotonic() - start_time) * 1000)
+            
+            status_code = response.status
+            server = response.headers.get('Server', 'Unknown')
+            
+            # Choose emoji based on response code
+            icon = "✅" if response.ok else "⚠️"
+            
+            result_text = language_manager.get_text('success', locale=locale)
+            text = (
+                f"{icon} {html.bold('Check Result:')}\n"
+                f"{'─' * 20}\n"
+                f"🌐 {html.bold('URL:')} {url}\n"
+                f"📊 {html.bold('Status:')} {status_code}\n"
+                f"⚡ {html.bold('Ping:')} {ping_ms} ms\n"
+                f"🖥 {html.bold('Server:')} {server}"
+            )
                 
     except Exception as e:
-        error_title = language_manager.get_text('error', message.from_user.id)
+        error_title = language_manager.get_text('error', locale=locale)
         text = (
             f"❌ {html.bold(error_title)}\n"
             f"{'─' * 20}\n"
@@ -59,8 +59,8 @@ async def cmd_status(message: types.Message, command: CommandObject):
 
     await sent_message.edit_text(text, parse_mode="HTML")
 
-@router.inline_query(F.query.startswith("st "))
-async def inline_status(inline_query: types.InlineQuery):
+@router.inline_query(F.query.startswith("st "), flags={"rate_limit": INLINE_HEAVY})
+async def inline_status(inline_query: types.InlineQuery, locale: str):
     url = inline_query.query[3:].strip()
     if not url:
         return
@@ -71,19 +71,18 @@ async def inline_status(inline_query: types.InlineQuery):
     start_time = time.monotonic()
     try:
         # Fast timeout to prevent inline from hanging (3 seconds)
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=3) as response:
-                ping_ms = round((time.monotonic() - start_time) * 1000)
-                status_code = response.status
-                icon = "✅" if response.ok else "⚠️"
-                
-                res_text = (
-                    f"{icon} {html.bold('Website Status:')}\n"
-                    f"🌐 {url}\n"
-                    f"📊 Code: {status_code} | ⚡ {ping_ms} ms"
-                )
+        async with http_client.get(url, profile="inline") as response:
+            ping_ms = round((time.monotonic() - start_time) * 1000)
+            status_code = response.status
+            icon = "✅" if response.ok else "⚠️"
+            
+            res_text = (
+                f"{icon} {html.bold('Website Status:')}\n"
+                f"🌐 {url}\n"
+                f"📊 Code: {status_code} | ⚡ {ping_ms} ms"
+            )
     except Exception as e:
-        error_text = language_manager.get_text('error', inline_query.from_user.id)
+        error_text = language_manager.get_text('error', locale=locale)
         res_text = f"❌ {html.bold(error_text)}: {url}\n🛠 {type(e).__name__}"
 
     # Format result
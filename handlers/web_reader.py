@@ -1,7 +1,12 @@
-import aiohttp
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from bs4 import BeautifulSoup
 from aiogram import Router, types, html
 from aiogram.filters import Command, CommandObject
+from utils.rate_limiter import HEAVY
+from utils.http_client import http_client
 from yarl import URL
 
 router = Router()
@@ -20,14 +25,13 @@ async def fetch_site_text(user_url: str):
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8"
         }
 
-        async with aiohttp.ClientSession(headers=headers) as session:
-            # allow_redirects=True — чтобы он шел по всем пересылкам страницы
-            async with session.get(target_url, timeout=15, allow_redirects=True) as response:
-                if response.status != 200:
-                    return f"Ошибка сервера: {response.status}"
+        # allow_redirects=True — чтобы он шел по всем пересылкам страницы
+        async with http_client.get(target_url, profile="page", headers=headers, allow_redirects=True) as response:
+            if response.status != 200:
+                return f"Ошибка сервера: {response.status}"
                 
-                # Читаем содержимое
-                html_content = await response.text()
+            # Читаем содержимое
+            html_content = await response.text()
 
         soup = BeautifulSoup(html_content, 'html.parser')
 
@@ -47,7 +51,7 @@ async def fetch_site_text(user_url: str):
     except Exception as e:
         return f"Не удалось прочитать {user_url}\nОшибка: {type(e).__name__}"
 
-@router.message(Command("getweb"))
+@router.message(Command("getweb"), flags={"rate_limit": HEAVY})
 async def cmd_getweb(message: types.Message, command: CommandObject):
     # command.args в aiogram 3 забирает ВООБЩЕ ВСЁ после пробела
     url_str = command.args
@@ -10,375 +10,276 @@ import string
 import typing
 import logging
 import asyncio
+import contextlib
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 import aiohttp
-from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
-
 from aiogram import Router, F, html
 from aiogram.filters import Command
 from aiogram.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent, Message, CallbackQuery, BufferedInputFile, InlineQueryResultCachedPhoto
+from utils.rate_limiter import INLINE_HEAVY
 
 import yandex_music
 import yandex_music.exceptions
 
 from utils.user_logger import user_logger
 from utils.crypto_manager import crypto_manager
+from utils.http_client import http_client
+from utils.music_cache import music_cache
+from utils.cache import TTLCache
 
 router = Router()
 logger = logging.getLogger(__name__)
 
 
 def init_yamusic_table():
-    db = user_logger.db_path
-    import sqlite3
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS yamusic_tokens (
-            user_id INTEGER PRIMARY KEY,
-            token_encrypted TEXT NOT NULL,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    cur.execute("PRAGMA table_info(yamusic_tokens)")
-    columns = [col[1] for col in cur.fetchall()]
-    
-    if 'token' in columns and 'token_encrypted' not in columns:
-        cur.execute("ALTER TABLE yamusic_tokens ADD COLUMN token_encrypted TEXT")
-        cur.execute("SELECT user_id, token FROM yamusic_tokens WHERE token IS NOT NULL")
-        tokens = cur.fetchall()
-        for user_id, token in tokens:
-            encrypted = crypto_manager.encrypt(token)
-            cur.execute("UPDATE yamusic_tokens SET token_encrypted = ? WHERE user_id = ?", (encrypted, user_id))
-        conn.commit()
-        try:
-            cur.execute("ALTER TABLE yamusic_tokens DROP COLUMN token")
-        except:
-            pass
-    
-    conn.close()
+    with user_logger.storage.transaction() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS yamusic_tokens (
+                user_id INTEGER PRIMARY KEY,
+                token_encrypted TEXT NOT NULL,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        cur.execute("PRAGMA table_info(yamusic_tokens)")
+        columns = [col[1] for col in cur.fetchall()]
+        
+        if 'token' in columns and 'token_encrypted' not in columns:
+            cur.execute("ALTER TABLE yamusic_tokens ADD COLUMN token_encrypted TEXT")
+            cur.execute("SELECT user_id, token FROM yamusic_tokens WHERE token IS NOT NULL")
+            tokens = cur.fetchall()
+            for user_id, token in tokens:
+                encrypted = crypto_manager.encrypt(token)
+                cur.execute("UPDATE yamusic_tokens SET token_encrypted = ? WHERE user_id = ?", (encrypted, user_id))
+            conn.commit()
+            try:
+                cur.execute("ALTER TABLE yamusic_tokens DROP COLUMN token")
+            except:
+                pass
 
 init_yamusic_table()
 
 def get_user_token(user_id: int) -> typing.Optional[str]:
-    import sqlite3
-    db = user_logger.db_path
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("SELECT token_encrypted FROM yamusic_tokens WHERE user_id = ?", (user_id,))
-    result = cur.fetchone()
-    conn.close()
+    result = user_logger.storage.fetchone(
+        "SELECT token_encrypted FROM yamusic_tokens WHERE user_id = ?", (user_id,)
+    )
     if not result:
         return None
     return crypto_manager.decrypt(result[0])
 
 def set_user_token(user_id: int, token: str):
-    import sqlite3
-    db = user_logger.db_path
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
     encrypted_token = crypto_manager.encrypt(token)
-    cur.execute("""
+    user_logger.storage.execute("""
         INSERT OR REPLACE INTO yamusic_tokens (user_id, token_encrypted, updated_at)
         VALUES (?, ?, CURRENT_TIMESTAMP)
     """, (user_id, encrypted_token))
-    conn.commit()
-    conn.close()
 
 def delete_user_token(user_id: int):
-    import sqlite3
-    db = user_logger.db_path
-    conn = sqlite3.connect(db)
-    cur = conn.cursor()
-    cur.execute("DELETE FROM yamusic_tokens WHERE user_id = ?", (user_id,))
-    conn.commit()
-    conn.close()
-
-class Banners:
-    def __init__(
-        self,
-        title: str,
-        artists: list[str],
-        duration: int,
-        progress: int,
-        track_cover: bytes,
-        fonts_data: list[bytes],
-        album_title: str = "Сингл",
-        meta_info: str = "Music",
-        is_liked: bool = False,
-        repeat_mode: str = "NONE",
-        blur: int = 0,
-    ):
-        self.title = title
-        self.artists = artists
-        self.duration = duration
-        self.progress = progress
-        self.track_cover = track_cover
-        self.fonts_data = fonts_data
-        self.album_title = album_title
-        self.meta_info = meta_info
-        self.is_liked = is_liked
-        self.repeat_mode = repeat_mode
-        self.blur = blur
-
-    def ultra(self) -> io.BytesIO:
-        WIDTH, HEIGHT = 2560, 1220
-
-        def get_font(size):
-            for font_bytes in self.fonts_data:
-                try:
-                    return ImageFont.truetype(io.BytesIO(font_bytes), size)
-                except Exception:
-                    continue
-            return ImageFont.load_default()
-
-        try:
-            original_cover = Image.open(io.BytesIO(self.track_cover)).convert("RGBA")
-        except Exception:
-            original_cover = Image.new("RGBA", (1000, 1000), "black")
-
-        dominant_color_img = original_cover.resize((1, 1), Image.Resampling.LANCZOS)
-        dominant_color = dominant_color_img.getpixel((0, 0))
-
-        r, g, b, a = dominant_color
-        brightness = (r * 299 + g * 587 + b * 114) / 1000
-        if brightness < 60:
-            r = min(255, r + 60)
-            g = min(255, g + 60)
-            b = min(255, b + 60)
-            dominant_color = (r, g, b, 255)
-
-        background = original_cover.copy()
-        bg_w, bg_h = background.size
-
-        target_ratio = WIDTH / HEIGHT
-        current_ratio = bg_w / bg_h
-
-        if current_ratio > target_ratio:
-            new_w = int(bg_h * target_ratio)
-            offset = (bg_w - new_w) // 2
-            background = background.crop((offset, 0, offset + new_w, bg_h))
-        else:
-            new_h = int(bg_w / target_ratio)
-            offset = (bg_h - new_h) // 2
-            background = background.crop((0, offset, bg_w, offset + new_h))
-
-        background = background.resize((WIDTH, HEIGHT), Image.Resampling.LANCZOS)
-        
-        if self.blur > 0:
-            background = background.filter(ImageFilter.GaussianBlur(radius=self.blur))
-
-        dark_overlay = Image.new("RGBA", (WIDTH, HEIGHT), (0, 0, 0, 180))
-        background = Image.alpha_composite(background, dark_overlay)
-
-        cover_size = 500
-        cover_x = (WIDTH - cover_size) // 2
-        cover_y = 160
-
-        glow_layer = Image.new("RGBA", (WIDTH, HEIGHT), (0, 0, 0, 0))
-        draw_glow = ImageDraw.Draw(glow_layer)
-
-        glow_rect_size = 620
-        g_x = (WIDTH - glow_rect_size) // 2
-        g_y = cover_y + (cover_size - glow_rect_size) // 2
+    user_logger.storage.execute("DELETE FROM yamusic_tokens WHERE user_id = ?", (user_id,))
 
-        draw_glow.rounded_rectangle(
-            (g_x, g_y, g_x + glow_rect_size, g_y + glow_rect_size),
-            radius=50,
-            fill=dominant_color,
-        )
-
-        glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=60))
-        glow_layer = ImageEnhance.Brightness(glow_layer).enhance(1.4)
-        glow_layer = ImageEnhance.Color(glow_layer).enhance(1.2)
-
-        background = Image.alpha_composite(background, glow_layer)
-
-        cover_img = original_cover.resize(
-            (cover_size, cover_size), Image.Resampling.LANCZOS
-        )
-
-        mask = Image.new("L", (cover_size, cover_size), 0)
-        draw_mask = ImageDraw.Draw(mask)
-        draw_mask.rounded_rectangle((0, 0, cover_size, cover_size), radius=45, fill=255)
-
-        background.paste(cover_img, (cover_x, cover_y), mask)
-
-        draw = ImageDraw.Draw(background)
-        center_x = WIDTH // 2
-        current_y = cover_y + cover_size + 130
-
-        def draw_text_shadow(text, pos, font, fill="white", anchor="ms"):
-            x, y = pos
-            draw.text(
-                (x + 2, y + 2), text, font=font, fill=(0, 0, 0, 240), anchor=anchor
-            )
-            draw.text((x, y), text, font=font, fill=fill, anchor=anchor)
-
-        font_title = get_font(100)
-        title_text = self.title
-        if len(title_text) > 30:
-            title_text = title_text[:30] + "..."
-        draw_text_shadow(title_text.upper(), (center_x, current_y), font_title)
-
-        current_y += 85
-
-        font_artist = get_font(65)
-        artist_text = ", ".join(self.artists)
-        if len(artist_text) > 45:
-            artist_text = artist_text[:45] + "..."
-        draw_text_shadow(
-            artist_text.upper(),
-            (center_x, current_y),
-            font_artist,
-            fill=(255, 255, 255, 240),
-        )
-
-        current_y += 80
-
-        bar_width = 800
-        bar_height = 6
-        font_time = get_font(40)
+YNISON_REDIRECT_URL = "wss://ynison.music.yandex.ru/redirector.YnisonRedirectService/GetRedirectToYnison"
 
-        bar_start_x = center_x - (bar_width // 2)
-        bar_end_x = center_x + (bar_width // 2)
-        bar_y = current_y
+class YnisonSession:
+    """Long-lived Ynison state socket for one account.
 
-        total_mins = self.duration // 1000 // 60
-        total_secs = (self.duration // 1000) % 60
-        total_time_str = f"{total_mins}:{total_secs:02d}"
-
-        cur_mins = self.progress // 1000 // 60
-        cur_secs = (self.progress // 1000) % 60
-        cur_time_str = f"{cur_mins}:{cur_secs:02d}"
-
-        draw_text_shadow(
-            cur_time_str, (bar_start_x - 30, bar_y), font_time, anchor="rm"
-        )
-        draw_text_shadow(
-            total_time_str, (bar_end_x + 30, bar_y), font_time, anchor="lm"
-        )
-
-        draw.line(
-            [(bar_start_x, bar_y), (bar_end_x, bar_y)],
-            fill=(255, 255, 255, 80),
-            width=bar_height,
-        )
-
-        if self.duration > 0:
-            progress_ratio = self.progress / self.duration
-        else:
-            progress_ratio = 0
-        progress_px = int(bar_width * progress_ratio)
-        if progress_px > bar_width:
-            progress_px = bar_width
-
-        draw.line(
-            [(bar_start_x, bar_y), (bar_start_x + progress_px, bar_y)],
-            fill="white",
-            width=bar_height + 5,
-        )
-        draw.ellipse(
-            (
-                bar_start_x + progress_px - 10,
-                bar_y - 10,
-                bar_start_x + progress_px + 10,
-                bar_y + 10,
-            ),
-            fill="white",
-        )
-
-        current_y += 80
-
-        font_album = get_font(50)
-        album_text = self.album_title
-        if len(album_text) > 50:
-            album_text = album_text[:50] + "..."
-        draw_text_shadow(
-            album_text, (center_x, current_y), font_album, fill=(230, 230, 230)
-        )
-        current_y += 60
+    The first ``get_state`` call starts a background reader that connects
+    through the redirector (the redirect ticket and host are cached and
+    reused on reconnects), announces a shadow device and then applies every
+    pushed state frame to ``state``, so later calls only read a dict. The
+    socket is closed once nobody has asked for the state for ``idle_ttl``
+    seconds.
+    """
 
-        font_meta = get_font(40)
-
-        draw_text_shadow(
-            self.meta_info, (center_x, current_y), font_meta, fill=(210, 210, 210)
-        )
-
-        icon_y_center = current_y - 15
-
-        if self.repeat_mode != "NONE":
-            rep_x = bar_start_x
-            rep_size = 18
-
-            draw.arc(
-                [
-                    rep_x - rep_size,
-                    icon_y_center - rep_size,
-                    rep_x + rep_size,
-                    icon_y_center + rep_size,
-                ],
-                start=40,
-                end=320,
-                fill=(220, 220, 220, 255),
-                width=3,
-            )
-
-            draw.polygon(
-                [
-                    (rep_x + rep_size - 2, icon_y_center - 8),
-                    (rep_x + rep_size + 8, icon_y_center),
-                    (rep_x + rep_size - 8, icon_y_center + 4),
-                ],
-                fill=(220, 220, 220, 255),
-            )
-
-            if self.repeat_mode == "ONE":
-                font_one = get_font(20)
-                draw.text(
-                    (rep_x + rep_size + 12, icon_y_center),
-                    "1",
-                    font=font_one,
-                    fill="white",
-                    anchor="lm",
-                )
-
-        heart_x = bar_end_x
-        heart_size = 20
-
-        c_r = heart_size // 2 + 2
+    def __init__(self, token: str, device_id: str, idle_ttl: float = 300.0,
+                 connect_timeout: float = 5.0, max_failures: int = 3):
+        self.token = token
+        self.device_id = device_id
+        self.idle_ttl = idle_ttl
+        self.connect_timeout = connect_timeout
+        self.max_failures = max_failures
+        self.state: dict = {}
+        # When the playback status (and so progress_ms) last changed
+        self.progress_at = 0.0
+        self.last_used = 0.0
+        self._redirect: typing.Optional[dict] = None
+        self._ready = asyncio.Event()
+        self._task: typing.Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._task is not None and not self._task.done() and self._ready.is_set()
+
+    async def get_state(self) -> dict:
+        """Latest pushed state, connecting first if needed ({} on failure)"""
+        self.last_used = time.monotonic()
+        if self._task is None or self._task.done():
+            self._ready.clear()
+            self._task = asyncio.create_task(self._run())
+        if not self._ready.is_set():
+            try:
+                await asyncio.wait_for(self._ready.wait(), self.connect_timeout)
+            except asyncio.TimeoutError:
+                return {}
+        return self.state
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self._ready.clear()
+        self.state = {}
+
+    def _idle(self) -> bool:
+        return time.monotonic() - self.last_used > self.idle_ttl
+
+    async def _run(self):
+        failures = 0
+        while not self._idle():
+            try:
+                await self._listen()
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ynison Error: {e}")
+                # The ticket may have expired, ask the redirector again
+                self._redirect = None
+                failures += 1
+            self._ready.clear()
+            if failures >= self.max_failures:
+                # Give up until the next get_state()
+                break
+            if failures:
+                await asyncio.sleep(min(2 ** failures, 30))
+        self._ready.clear()
+
+    async def _listen(self):
+        if self._redirect is None:
+            async with http_client.ws_connect(
+                YNISON_REDIRECT_URL, headers=self._headers(), heartbeat=30
+            ) as ws:
+                try:
+                    response = await ws.receive(timeout=self.connect_timeout)
+                except asyncio.TimeoutError:
+                    raise ConnectionError("redirector timed out") from None
+                if response.type != aiohttp.WSMsgType.TEXT:
+                    raise ConnectionError(f"redirector {response.type.name.lower()}")
+                self._redirect = json.loads(response.data)
+
+        async with http_client.ws_connect(
+            f"wss://{self._redirect['host']}/ynison_state.YnisonStateService/PutYnisonState",
+            headers=self._headers(self._redirect["redirect_ticket"]),
+            heartbeat=30,
+        ) as ws:
+            await ws.send_str(json.dumps(self._device_payload()))
+            timeout = self.connect_timeout
+            while True:
+                try:
+                    msg = await ws.receive(timeout=timeout)
+                except asyncio.TimeoutError:
+                    # No first state frame in time: the handshake stalled
+                    if not self._ready.is_set():
+                        raise ConnectionError("no state received") from None
+                else:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        raise ConnectionError(f"socket {msg.type.name.lower()}")
+                    self._apply(json.loads(msg.data))
+                timeout = self.idle_ttl - (time.monotonic() - self.last_used)
+                if timeout <= 0:
+                    return
+
+    def _apply(self, data: dict):
+        if "error" in data:
+            raise ConnectionError(data["error"])
+        status = data.get("player_state", {}).get("status")
+        if status is not None and status != self.state.get("player_state", {}).get("status"):
+            self.progress_at = time.monotonic()
+        self.state = {**self.state, **data}
+        self._ready.set()
+
+    def _headers(self, ticket: typing.Optional[str] = None) -> dict:
+        ws_proto = {
+            "Ynison-Device-Id": self.device_id,
+            "Ynison-Device-Info": json.dumps({"app_name": "Chrome", "type": 1}),
+        }
+        if ticket:
+            ws_proto["Ynison-Redirect-Ticket"] = ticket
+        return {
+            "Sec-WebSocket-Protocol": f"Bearer, v2, {json.dumps(ws_proto)}",
+            "Origin": "http://music.yandex.ru",
+            "Authorization": f"OAuth {self.token}",
+        }
 
-        c1_box = (
-            heart_x - c_r * 2,
-            icon_y_center - c_r - 2,
-            heart_x,
-            icon_y_center + c_r - 2,
-        )
-        c2_box = (
-            heart_x,
-            icon_y_center - c_r - 2,
-            heart_x + c_r * 2,
-            icon_y_center + c_r - 2,
-        )
-        tri_points = [
-            (heart_x - c_r * 2 + 2, icon_y_center + 1),
-            (heart_x + c_r * 2 - 2, icon_y_center + 1),
-            (heart_x, icon_y_center + heart_size + 5),
-        ]
-
-        by = io.BytesIO()
-        background.save(by, format="PNG")
-        by.seek(0)
-        by.name = "banner.png"
-        return by
+    def _device_payload(self) -> dict:
+        return {
+            "update_full_state": {
+                "player_state": {
+                    "player_queue": {
+                        "current_playable_index": -1,
+                        "entity_id": "",
+                        "entity_type": "VARIOUS",
+                        "playable_list": [],
+                        "options": {"repeat_mode": "NONE"},
+                        "entity_context": "BASED_ON_ENTITY_BY_DEFAULT",
+                        "version": {
+                            "device_id": self.device_id,
+                            "version": 9021243204784341000,
+                            "timestamp_ms": 0,
+                        },
+                        "from_optional": "",
+                    },
+                    "status": {
+                        "duration_ms": 0,
+                        "paused": True,
+                        "playback_speed": 1,
+                        "progress_ms": 0,
+                        "version": {
+                            "device_id": self.device_id,
+                            "version": 8321822175199937000,
+                            "timestamp_ms": 0,
+                        },
+                    },
+                },
+                "device": {
+                    "capabilities": {
+                        "can_be_player": True,
+                        "can_be_remote_controller": False,
+                        "volume_granularity": 16,
+                    },
+                    "info": {
+                        "device_id": self.device_id,
+                        "type": "WEB",
+                        "title": "Chrome Browser",
+                        "app_name": "Chrome",
+                    },
+                    "volume_info": {"volume": 0},
+                    "is_shadow": True,
+                },
+                "is_currently_active": False,
+            },
+            "rid": "ac281c26-a047-4419-ad00-e4fbfda1cba3",
+            "player_action_timestamp_ms": 0,
+            "activity_interception_type": "DO_NOT_INTERCEPT_BY_DEFAULT",
+        }
 
 class YaMusicClient:
     def __init__(self, token: str):
         self.token = token
         self.client = None
         self.device_id = "".join(random.choices(string.ascii_lowercase, k=16))
+        self.ynison = YnisonSession(token, self.device_id)
+        self.last_used = time.monotonic()
+        # Results younger than this are reused with extrapolated progress
+        self.now_playing_ttl = 1.5
+        self._now_playing: dict = {}
+        self._now_playing_at = 0.0
+        self._now_playing_task: typing.Optional[asyncio.Task] = None
 
     async def get_client(self):
         if self.client:
@@ -392,20 +293,43 @@ class YaMusicClient:
 
     async def download_bytes(self, url: str) -> typing.Optional[bytes]:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10) as resp:
-                    if resp.status == 200:
-                        return await resp.read()
+            async with http_client.get(url, profile="media", headers={"User-Agent": "Mozilla/5.0"}) as resp:
+                if resp.status == 200:
+                    return await resp.read()
         except Exception:
             return None
         return None
 
     async def get_now_playing(self):
+        """Now playing info; concurrent callers share one in-flight lookup"""
+        if time.monotonic() - self._now_playing_at < self.now_playing_ttl:
+            return self._extrapolate(self._now_playing)
+        if self._now_playing_task is None:
+            self._now_playing_task = asyncio.create_task(self._fetch_now_playing())
+            self._now_playing_task.add_done_callback(self._now_playing_done)
+        return self._extrapolate(await asyncio.shield(self._now_playing_task))
+
+    def _now_playing_done(self, task: asyncio.Task):
+        self._now_playing_task = None
+        if not task.cancelled() and task.exception() is None:
+            self._now_playing = task.result()
+            self._now_playing_at = time.monotonic()
+
+    @staticmethod
+    def _extrapolate(now: dict) -> dict:
+        """Advance progress_ms by the time elapsed since the state was pushed"""
+        if not now or now["paused"]:
+            return now
+        progress_ms = now["progress_ms"] + int((time.monotonic() - now["progress_at"]) * 1000)
+        return {**now, "progress_ms": min(progress_ms, now["duration_ms"])}
+
+    async def _fetch_now_playing(self):
         ym_client = await self.get_client()
         if not ym_client:
             return {}
 
-        ynison = await self._get_ynison()
+        ynison = await self.ynison.get_state()
+        progress_at = self.ynison.progress_at
         if not ynison or (
             len(
                 ynison.get("player_state", {})
@@ -422,7 +346,7 @@ class YaMusicClient:
                 player_state["player_queue"]["current_playable_index"]
             ]
 
-            track_object = (await ym_client.tracks(raw_track["playable_id"]))[0]
+            track_object = await music_cache.get_track(ym_client, raw_track["playable_id"])
 
             status = player_state["status"]
             progress_ms = int(status["progress_ms"])
@@ -441,6 +365,8 @@ class YaMusicClient:
                     "playable_id": raw_track["playable_id"],
                     "duration_ms": duration_ms,
                     "progress_ms": progress_ms,
+                    # Monotonic time progress_ms was reported at
+                    "progress_at": progress_at,
                     "entity_id": player_state["player_queue"]["entity_id"],
                     "entity_type": player_state["player_queue"]["entity_type"],
                     "repeat_mode": repeat_mode,
@@ -469,104 +395,101 @@ class YaMusicClient:
             logger.error(f"Get Now Playing Error: {e}")
             return {}
 
-    async def _get_ynison(self):
-        async def create_ws(token, ws_proto):
-            async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(
-                    "wss://ynison.music.yandex.ru/redirector.YnisonRedirectService/GetRedirectToYnison",
-                    headers={
-                        "Sec-WebSocket-Protocol": f"Bearer, v2, {json.dumps(ws_proto)}",
-                        "Origin": "http://music.yandex.ru",
-                        "Authorization": f"OAuth {token}",
-                    },
-                ) as ws:
-                    response = await ws.receive()
-                    return json.loads(response.data)
+    async def close(self):
+        await self.ynison.close()
+
+class ClientRegistry:
+    """Per-user YaMusicClient instances, bounded by count and idle time.
+
+    Lookups are served from memory; the token is only read from the DB and
+    decrypted when a user has no resident client. Users without a token are
+    remembered for ``negative_ttl`` seconds. Clients are kept in LRU order,
+    so the least recently used one is evicted past ``maxsize`` and idle ones
+    are dropped from the front on every lookup; evicted clients have their
+    Ynison socket closed.
+    """
+
+    def __init__(self, maxsize: int = 500, idle_ttl: float = 1800.0, negative_ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        self._clients: "OrderedDict[int, YaMusicClient]" = OrderedDict()
+        self._no_token = TTLCache(maxsize=10000, ttl=negative_ttl)
+        self._closing: typing.Set[asyncio.Task] = set()
+        self.hits = 0
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, user_id: int) -> typing.Optional[YaMusicClient]:
+        now = time.monotonic()
+        self._evict_idle(now)
+        client = self._clients.get(user_id)
+        if client is not None:
+            self._clients.move_to_end(user_id)
+            client.last_used = now
+            self.hits += 1
+            return client
+        if user_id in self._no_token:
+            return None
 
-        ws_proto = {
-            "Ynison-Device-Id": self.device_id,
-            "Ynison-Device-Info": json.dumps({"app_name": "Chrome", "type": 1}),
+        token = get_user_token(user_id)
+        if not token:
+            self._no_token.set(user_id, True)
+            return None
+        client = self._clients[user_id] = YaMusicClient(token)
+        self.created += 1
+        while len(self._clients) > self.maxsize:
+            self._evict(next(iter(self._clients)))
+        return client
+
+    async def invalidate(self, user_id: int):
+        """Forget the user's client and token state (token set or cleared)"""
+        self._no_token.pop(user_id)
+        client = self._clients.pop(user_id, None)
+        if client:
+            await client.close()
+
+    async def close(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.close()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def _evict_idle(self, now: float):
+        while self._clients:
+            user_id, client = next(iter(self._clients.items()))
+            if now - client.last_used <= self.idle_ttl:
+                break
+            self._evict(user_id)
+
+    def _evict(self, user_id: int):
+        client = self._clients.pop(user_id)
+        self.evicted += 1
+        task = asyncio.create_task(client.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    @property
+    def stats(self) -> typing.Dict[str, int]:
+        return {
+            "clients": len(self._clients),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "created": self.created,
+            "evicted": self.evicted,
+            "no_token": len(self._no_token),
         }
 
-        try:
-            data = await create_ws(self.token, ws_proto)
-            ws_proto["Ynison-Redirect-Ticket"] = data["redirect_ticket"]
-            payload = {
-                "update_full_state": {
-                    "player_state": {
-                        "player_queue": {
-                            "current_playable_index": -1,
-                            "entity_id": "",
-                            "entity_type": "VARIOUS",
-                            "playable_list": [],
-                            "options": {"repeat_mode": "NONE"},
-                            "entity_context": "BASED_ON_ENTITY_BY_DEFAULT",
-                            "version": {
-                                "device_id": self.device_id,
-                                "version": 9021243204784341000,
-                                "timestamp_ms": 0,
-                            },
-                            "from_optional": "",
-                        },
-                        "status": {
-                            "duration_ms": 0,
-                            "paused": True,
-                            "playback_speed": 1,
-                            "progress_ms": 0,
-                            "version": {
-                                "device_id": self.device_id,
-                                "version": 8321822175199937000,
-                                "timestamp_ms": 0,
-                            },
-                        },
-                    },
-                    "device": {
-                        "capabilities": {
-                            "can_be_player": True,
-                            "can_be_remote_controller": False,
-                            "volume_granularity": 16,
-                        },
-                        "info": {
-                            "device_id": self.device_id,
-                            "type": "WEB",
-                            "title": "Chrome Browser",
-                            "app_name": "Chrome",
-                        },
-                        "volume_info": {"volume": 0},
-                        "is_shadow": True,
-                    },
-                    "is_currently_active": False,
-                },
-                "rid": "ac281c26-a047-4419-ad00-e4fbfda1cba3",
-                "player_action_timestamp_ms": 0,
-                "activity_interception_type": "DO_NOT_INTERCEPT_BY_DEFAULT",
-            }
-            async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(
-                    f"wss://{data['host']}/ynison_state.YnisonStateService/PutYnisonState",
-                    headers={
-                        "Sec-WebSocket-Protocol": f"Bearer, v2, {json.dumps(ws_proto)}",
-                        "Origin": "http://music.yandex.ru",
-                        "Authorization": f"OAuth {self.token}",
-                    },
-                ) as ws:
-                    await ws.send_str(json.dumps(payload))
-                    response = await ws.receive()
-                    ynison: dict = json.loads(response.data)
-            return ynison
-        except Exception as e:
-            logger.error(f"Ynison Error: {e}")
-            return {}
-
-clients_cache = {}
+# Global instance
+clients = ClientRegistry()
 
-def get_client(user_id: int) -> typing.Optional[YaMusicClient]:
-    token = get_user_token(user_id)
-    if not token:
-        return None
-    if user_id not in clients_cache:
-        clients_cache[user_id] = YaMusicClient(token)
-    return clients_cache[user_id]
+@router.shutdown()
+async def close_clients():
+    await clients.close()
 
 DUMP_CHANNEL_ID = -1003674095314
 
@@ -599,22 +522,20 @@ async def cmd_yamusic(message: Message):
         
         if token_arg.lower() == "clear":
             delete_user_token(message.from_user.id)
-            if message.from_user.id in clients_cache:
-                del clients_cache[message.from_user.id]
+            await clients.invalidate(message.from_user.id)
             await message.answer("✅ Yandex Music token removed.")
         else:
             set_user_token(message.from_user.id, token_arg)
-            if message.from_user.id in clients_cache:
-                del clients_cache[message.from_user.id]
+            await clients.invalidate(message.from_user.id)
             await message.answer("✅ Yandex Music token saved successfully!")
 
-@router.inline_query(F.query.startswith("ym"))
+@router.inline_query(F.query.startswith("ym"), flags={"rate_limit": INLINE_HEAVY})
 async def inline_yamusic(inline_query: InlineQuery):
     """Show currently playing track via inline query"""
     query_text = inline_query.query[2:].strip()
     user_id = inline_query.from_user.id
     
-    ym_client = get_client(user_id)
+    ym_client = clients.get(user_id)
     if not ym_client:
         result_id = hashlib.md5(f"no_token_{user_id}".encode()).hexdigest()
         await inline_query.answer(
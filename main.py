@@ -1,10 +1,11 @@
-from middlewares.antiflood import AntiFloodMiddleware
-from middlewares.user_logging import UserLoggingMiddleware
-from middlewares.cooldown import CooldownMiddleware
+from middlewares.pipeline import PreDispatchMiddleware
 import asyncio
 import logging
 from aiogram import Bot, Dispatcher
 from config_reader import config
+from utils.log_writer import log_writer
+from utils.http_client import http_client
+from utils.user_logger import user_logger
 
 # Import all modules including new ones
 from handlers import (
@@ -23,21 +24,20 @@ async def main():
     bot = Bot(token=config.bot_token.get_secret_value())
     dp = Dispatcher()
     
-    # Add middleware (order matters)
-    # 1. User logging first
-    dp.message.middleware(UserLoggingMiddleware())
-    dp.callback_query.middleware(UserLoggingMiddleware())
-    dp.inline_query.middleware(UserLoggingMiddleware())
+    # Background interaction log writer: started with polling, drained on shutdown
+    dp.startup.register(log_writer.start)
+    dp.shutdown.register(log_writer.stop)
     
-    # 2. Cooldown middleware (before antiflood)
-    dp.message.middleware(CooldownMiddleware())
-    dp.callback_query.middleware(CooldownMiddleware())
-    dp.inline_query.middleware(CooldownMiddleware())
+    # Shared HTTP session (keep-alive pool + DNS cache) for all outbound requests
+    dp.startup.register(http_client.start)
+    dp.shutdown.register(http_client.close)
     
-    # 3. Anti-flood middleware
-    antiflood = AntiFloodMiddleware(msg_limit=3.0, inline_limit=0.7)
-    dp.message.middleware(antiflood)
-    dp.inline_query.middleware(antiflood)
+    # Add middleware: one fused pass per update
+    # (log enqueue -> ban check -> rate limit by the rate_limit flag -> locale)
+    pre_dispatch = PreDispatchMiddleware()
+    dp.message.middleware(pre_dispatch)
+    dp.callback_query.middleware(pre_dispatch)
+    dp.inline_query.middleware(pre_dispatch)
     
     # Register routers (order matters for inline handlers)
     dp.include_router(admin.router)  # Admin commands first
@@ -58,7 +58,13 @@ async def main():
 
     # Clear update queue and start
     await bot.delete_webhook(drop_pending_updates=True)
-    await dp.start_polling(bot)
+    
+    # Keep the in-memory ban list in sync with changes made outside this process
+    ban_watcher = asyncio.create_task(user_logger.watch_bans())
+    try:
+        await dp.start_polling(bot)
+    finally:
+        ban_watcher.cancel()
 
 if __name__ == "__main__":
     try:
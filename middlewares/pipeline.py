@@ -0,0 +1,142 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Union
+from aiogram import BaseMiddleware
+from aiogram.types import Message, CallbackQuery, InlineQuery, User
+from utils.user_logger import user_logger
+from utils.log_writer import log_writer
+from utils.language_manager import language_manager
+from utils.rate_limiter import RateLimiter, RateLimit, DEFAULT, INLINE
+
+MESSAGE = "message"
+CALLBACK = "callback"
+INLINE_QUERY = "inline"
+
+_KINDS = {Message: MESSAGE, CallbackQuery: CALLBACK, InlineQuery: INLINE_QUERY}
+
+# Returned by a step to stop processing without replying
+STOP = object()
+
+class UpdateContext:
+    """Everything the pre-dispatch steps need, extracted from the event once"""
+    __slots__ = ("event", "kind", "user", "command", "text", "chat_type")
+
+    def __init__(self, event, kind: str, user: User, command: Optional[str],
+                 text: Optional[str], chat_type: Optional[str]):
+        self.event = event
+        self.kind = kind
+        self.user = user
+        self.command = command
+        self.text = text
+        self.chat_type = chat_type
+
+def extract_context(event) -> Optional[UpdateContext]:
+    kind = _KINDS.get(type(event))
+    if kind is None or event.from_user is None:
+        return None
+
+    if kind == MESSAGE:
+        text = event.text or event.caption
+        # Extract command if present
+        command = text.split(maxsplit=1)[0] if text and text.startswith('/') else None
+        return UpdateContext(event, kind, event.from_user, command, text, event.chat.type)
+    if kind == CALLBACK:
+        return UpdateContext(event, kind, event.from_user, "callback", event.data, "callback")
+    return UpdateContext(event, kind, event.from_user, "inline", event.query, "inline")
+
+# A step returns None to continue, STOP to drop the update silently, or an
+# awaitable (usually a reply to the user) that is awaited before dropping it.
+Step = Callable[[UpdateContext, Dict[str, Any]], Union[None, object, Awaitable[Any]]]
+
+def log_step(ctx: UpdateContext, data: Dict[str, Any]):
+    """Queue the interaction for the background log writer"""
+    user = ctx.user
+    log_writer.enqueue(
+        user_id=user.id,
+        username=user.username,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        command=ctx.command,
+        message_text=ctx.text,
+        chat_type=ctx.chat_type
+    )
+
+def ban_step(ctx: UpdateContext, data: Dict[str, Any]):
+    """Drop updates from banned users (in-memory lookup)"""
+    if not user_logger.is_user_banned(ctx.user.id):
+        return None
+    if ctx.kind == CALLBACK:
+        # Answer the callback but don't process further
+        return ctx.event.answer("You are banned", show_alert=True)
+    return STOP
+
+class ThrottleStep:
+    """Token-bucket throttling driven by the handler's ``rate_limit`` flag
+
+    Handlers declare a RateLimit profile (cost, burst, refill interval);
+    unflagged ones fall back to DEFAULT for messages and INLINE for inline
+    queries. Callback queries are not throttled. Each profile gets its own
+    bounded per-user bucket store.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.limiters: Dict[str, RateLimiter] = {}
+
+    def _limiter(self, profile: RateLimit) -> RateLimiter:
+        limiter = self.limiters.get(profile.name)
+        if limiter is None:
+            limiter = self.limiters[profile.name] = RateLimiter(
+                profile.interval, burst=profile.burst, max_entries=self.max_entries
+            )
+        return limiter
+
+    def __call__(self, ctx: UpdateContext, data: Dict[str, Any]):
+        if ctx.kind == CALLBACK:
+            return None
+        handler = data.get("handler")
+        profile = (handler.flags.get("rate_limit") if handler else None) or (DEFAULT if ctx.kind == MESSAGE else INLINE)
+
+        wait = self._limiter(profile).hit(ctx.user.id, profile.cost)
+        if not wait:
+            return None
+        if ctx.kind == MESSAGE:
+            return ctx.event.answer(f"⏳ Please wait {wait:.1f} seconds before using this command again.")
+        # Inline queries are silently ignored to avoid extra load
+        return STOP
+
+def locale_step(ctx: UpdateContext, data: Dict[str, Any]):
+    """Resolve the user's locale once; handlers receive it as ``locale``"""
+    data["locale"] = language_manager.resolve_locale(ctx.user.id)
+
+class PreDispatchMiddleware(BaseMiddleware):
+    """Single pre-dispatch pass over message, callback and inline updates
+
+    The user, event kind and command are extracted once, then the steps run
+    in order and the first one that rejects the update short-circuits the
+    rest. By default: log enqueue, ban check, rate limiting, locale.
+    """
+
+    def __init__(self, steps: Optional[Sequence[Step]] = None):
+        self.steps = tuple(steps) if steps is not None else (log_step, ban_step, ThrottleStep(), locale_step)
+        super().__init__()
+
+    async def __call__(self, handler, event, data):
+        ctx = extract_context(event)
+        if ctx is None:
+            return await handler(event, data)
+
+        for step in self.steps:
+            result = step(ctx, data)
+            if result is None:
+                continue
+            if result is not STOP:
+                try:
+                    await result
+                except Exception:
+                    pass  # If we can't send a reply, just drop the update
+            return None
+
+        return await handler(event, data)
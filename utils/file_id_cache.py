@@ -0,0 +1,93 @@
+import hashlib
+import logging
+from typing import Dict, Optional, Union
+
+from .cache import TTLCache
+from .storage import Storage
+from .user_logger import user_logger
+
+logger = logging.getLogger(__name__)
+
+class FileIdCache:
+    """Content hash -> Telegram ``file_id`` of media the bot already uploaded.
+
+    A file uploaded once (to the dump channel, for inline results) can be
+    sent again by its ``file_id``, so an identical payload skips both
+    generating the file and uploading it. The index lives in the bot database
+    and survives restarts; a TTLCache in front serves repeated lookups
+    without touching SQLite, and also remembers misses until the next ``set``.
+    """
+
+    def __init__(self, storage: Storage, cache_size: int = 5000, cache_ttl: float = 3600.0):
+        self.storage = storage
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.init_database()
+
+    def init_database(self):
+        self.storage.execute("""
+            CREATE TABLE IF NOT EXISTS file_ids (
+                content_key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                file_id TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    @staticmethod
+    def make_key(kind: str, payload: Union[str, bytes]) -> str:
+        """Key of a payload; ``kind`` keeps equal payloads of different media apart"""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        return f"{kind}:{hashlib.blake2b(payload, digest_size=16).hexdigest()}"
+
+    def get(self, key: str) -> Optional[str]:
+        file_id = self.cache.get(key)
+        if file_id is None:
+            try:
+                row = self.storage.fetchone("SELECT file_id FROM file_ids WHERE content_key = ?", (key,))
+            except Exception as e:
+                logger.error(f"Error reading file_id for {key}: {e}")
+                row = None
+            # "" marks a known miss, so it isn't looked up again until set()
+            file_id = row[0] if row else ""
+            self.cache.set(key, file_id)
+
+        if file_id:
+            self.hits += 1
+            return file_id
+        self.misses += 1
+        return None
+
+    def set(self, key: str, file_id: str):
+        self.cache.set(key, file_id)
+        try:
+            self.storage.execute(
+                "INSERT OR REPLACE INTO file_ids (content_key, kind, file_id) VALUES (?, ?, ?)",
+                (key, key.split(":", 1)[0], file_id),
+            )
+        except Exception as e:
+            logger.error(f"Error saving file_id for {key}: {e}")
+
+    def delete(self, key: str):
+        """Forget a file_id Telegram no longer accepts"""
+        self.cache.pop(key)
+        try:
+            self.storage.execute("DELETE FROM file_ids WHERE content_key = ?", (key,))
+        except Exception as e:
+            logger.error(f"Error deleting file_id for {key}: {e}")
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "db_reads": self.cache.misses,
+        }
+
+# Global instance
+file_id_cache = FileIdCache(user_logger.storage)
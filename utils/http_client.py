@@ -0,0 +1,82 @@
+import logging
+from typing import Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Per-purpose timeouts: inline answers must beat Telegram's inline deadline,
+# page fetches may follow redirects, media downloads stream larger bodies.
+TIMEOUTS: Dict[str, aiohttp.ClientTimeout] = {
+    "inline": aiohttp.ClientTimeout(total=3, sock_connect=2),
+    "default": aiohttp.ClientTimeout(total=10, sock_connect=5),
+    "page": aiohttp.ClientTimeout(total=15, sock_connect=5),
+    "media": aiohttp.ClientTimeout(total=30, sock_connect=5, sock_read=10),
+}
+
+class HttpClient:
+    """Application-wide aiohttp session for all outbound HTTP.
+
+    One connector keeps TCP/TLS connections alive between requests, caches
+    DNS lookups for ``ttl_dns_cache`` seconds and caps concurrent connections
+    overall and per host. Cookies are never stored, so nothing one user's
+    request receives is sent with another's. Websockets hold their
+    connection for as long as they are open, so they get a second session
+    whose connector has no limit and never takes slots from the pooled
+    requests. Started on dispatcher startup and closed on shutdown; sessions
+    are created lazily if used before that.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10,
+                 ttl_dns_cache: int = 300, keepalive_timeout: float = 30.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws_session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=TIMEOUTS["default"], cookie_jar=aiohttp.DummyCookieJar()
+            )
+        return self._session
+
+    @property
+    def ws_session(self) -> aiohttp.ClientSession:
+        if self._ws_session is None or self._ws_session.closed:
+            connector = aiohttp.TCPConnector(limit=0, ttl_dns_cache=self.ttl_dns_cache)
+            self._ws_session = aiohttp.ClientSession(
+                connector=connector, timeout=TIMEOUTS["default"], cookie_jar=aiohttp.DummyCookieJar()
+            )
+        return self._ws_session
+
+    async def start(self):
+        self.session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._ws_session is not None and not self._ws_session.closed:
+            await self._ws_session.close()
+        self._session = None
+        self._ws_session = None
+
+    def get(self, url, profile: str = "default", **kwargs):
+        """``session.get`` with the timeout of the given profile"""
+        return self.session.get(url, timeout=TIMEOUTS[profile], **kwargs)
+
+    def ws_connect(self, url, **kwargs):
+        """``ws_connect`` on the websocket session, outside the pooled connector"""
+        return self.ws_session.ws_connect(url, **kwargs)
+
+# Global instance
+http_client = HttpClient()
@@ -0,0 +1,51 @@
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class KeyboardCache:
+    """Builds static inline keyboards once per argument combination and reuses them
+
+    aiogram markups are mutable pydantic models, so ``get`` hands out a copy
+    with its own rows and buttons: a handler that edits it doesn't change the
+    keyboard for everyone else. Copying skips validation and is still cheaper
+    than building. Builders must only depend on their arguments (e.g. locale,
+    current selection), never on per-user data.
+    """
+
+    def __init__(self):
+        self._builders: Dict[str, Callable[..., Any]] = {}
+        self._keyboards: Dict[Tuple[Hashable, ...], Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, name: str, builder: Optional[Callable[..., Any]] = None):
+        """Register a keyboard builder; usable as ``@keyboard_cache.register("name")``"""
+        if builder is None:
+            return lambda func: self.register(name, func)
+        self._builders[name] = builder
+        self.invalidate(name)
+        return builder
+
+    def get(self, name: str, *args: Hashable):
+        key = (name, *args)
+        keyboard = self._keyboards.get(key)
+        if keyboard is None:
+            self.misses += 1
+            keyboard = self._keyboards[key] = self._builders[name](*args)
+        else:
+            self.hits += 1
+        return keyboard.model_copy(update={
+            "inline_keyboard": [[button.model_copy() for button in row] for row in keyboard.inline_keyboard]
+        })
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop cached keyboards of one builder (or all of them)"""
+        if name is None:
+            self._keyboards.clear()
+        else:
+            for key in [k for k in self._keyboards if k[0] == name]:
+                del self._keyboards[key]
+
+    def __len__(self) -> int:
+        return len(self._keyboards)
+
+# Global instance
+keyboard_cache = KeyboardCache()
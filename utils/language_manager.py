@@ -1,144 +1,142 @@
-from typing import Dict, Optional
+import os
+import json
+import logging
+from string import Formatter
+from typing import Any, Dict, List, Optional
 from .user_logger import user_logger
+from .keyboards import keyboard_cache
+
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "locales")
+logger = logging.getLogger(__name__)
+
+class CompiledTemplate:
+    """Translation string parsed once at load time"""
+    __slots__ = ("text", "fields", "_format", "_literal")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.fields = frozenset(
+            name.split(".")[0].split("[")[0]
+            for _, name, _, _ in Formatter().parse(text)
+            if name is not None
+        )
+        # Templates without placeholders are rendered once here
+        self._literal = text.format() if not self.fields else None
+        self._format = text.format_map
+
+    def render(self, kwargs: Dict[str, Any]) -> str:
+        if self._literal is not None:
+            return self._literal
+        if kwargs.keys() >= self.fields:
+            return self._format(kwargs)
+        # If some placeholders aren't provided, return text with basic formatting
+        return self.text
 
 class LanguageManager:
-    def __init__(self):
-        self.translations = {
-            'en': {
-                 'start': "👋 Hello, {name}!\nBot is ready to work. Use /help to see the list of commands.",
-                'help': (
-                    "🛠 <b>Available commands:</b>\n"
-                    "────────────────────\n"
-                    "🎵 <b>/yamusic token</b> — Set Yandex Music token\n"
-                    "🖼 <b>/qr text</b> — Create QR code\n"
-                    "🔗 <b>/short url</b> — Shorten URL\n"
-                    "📁 <b>/convert format</b> — Convert files\n"
-                    "🌐 <b>/status domain</b> — Check website status\n"
-                    "🔍 <b>/whois target</b> — WHOIS information\n"
-                    "🔧 <b>/settings</b> — Bot settings\n"
-                    "❓ <b>/help</b> — This menu\n\n"
-                    "💡 <i>Inline modes (type in any chat):</i>\n"
-                    "<code>@{username} ym</code> — Now playing\n"
-                    "<code>@{username} qr text</code>\n"
-                    "<code>@{username} short url</code>\n"
-                    "<code>@{username} st url</code>\n"
-                    "<code>@{username} sys</code>\n\n"
-                    "Developed by @wineaki\n"
-                    "Licensing: GNU GPL v3.0\n"
-                ),
-                'settings': "⚙️ Settings",
-                'language': "🌐 Language",
-                'select_language': "Select your preferred language:",
-                'language_updated': "✅ Language updated successfully!",
-                'banned_message': "You are banned from using this bot.",
-                'message_delivered': "Message delivered to administrator.",
-                'qr_created': "✅ QR code created successfully!",
-                'status_checking': "🔍 Checking website status...",
-                'whois_info': "🔍 WHOIS information:",
-                'server_info': "🖥 System Monitor",
-                 'not_found': "❌ Not found",
-                'error': "❌ Error occurred",
-                'success': "✅ Success",
-                'url_short': "🔗 Shortened URL",
-                'convert': "📁 File Conversion",
-                'convert_success': "✅ Converted to {format}",
-                'convert_too_large': "❌ File exceeds 100MB",
-                'convert_unsupported': "❌ Format not supported"
-            },
-            'ru': {
-                'start': "👋 Привет, {name}!\nБот готов к работе. Используй /help, чтобы увидеть список команд.",
-                'help': (
-                    "🛠 <b>Доступные команды:</b>\n"
-                    "────────────────────\n"
-                    "🎵 <b>/yamusic токен</b> — Настроить Яндекс.Музыку\n"
-                    "🖼 <b>/qr текст</b> — Создать QR-код\n"
-                    "🔗 <b>/short url</b> — Сократить URL\n"
-                    "📁 <b>/convert формат</b> — Конвертировать файл\n"
-                    "🌐 <b>/status домен</b> — Проверить сайт\n"
-                    "🔍 <b>/whois цель</b> — WHOIS инфо\n"
-                    "🔧 <b>/settings</b> — Настройки бота\n"
-                    "❓ <b>/help</b> — Это меню\n\n"
-                    "💡 <i>Inline режимы (вводи в любом чате):</i>\n"
-                    "<code>@{username} ym</code> — Сейчас играет\n"
-                    "<code>@{username} qr текст</code>\n"
-                    "<code>@{username} short url</code>\n"
-                    "<code>@{username} st url</code>\n"
-                    "<code>@{username} sys</code>\n\n"
-                    "Разработано @wineaki"
-                ),
-                'settings': "⚙️ Настройки",
-                'language': "🌐 Язык",
-                'select_language': "Выберите предпочитаемый язык:",
-                'language_updated': "✅ Язык успешно обновлен!",
-                'banned_message': "Вы заблокированы в этом боте.",
-                'message_delivered': "Сообщение доставлено администратору.",
-                'qr_created': "✅ QR-код успешно создан!",
-                'status_checking': "🔍 Проверка статуса сайта...",
-                'whois_info': "🔍 WHOIS информация:",
-                'server_info': "🖥 Системный монитор",
-                 'not_found': "❌ Не найдено",
-                'error': "❌ Произошла ошибка",
-                'success': "✅ Успешно",
-                'url_short': "🔗 Сокращенная ссылка",
-                'convert': "📁 Конвертация файла",
-                'convert_success': "✅ Конвертировано в {format}",
-                'convert_too_large': "❌ Файл превышает 100МБ",
-                'convert_unsupported': "❌ Формат не поддерживается"
-            }
-        }
-    
-    def get_text(self, key: str, user_id: Optional[int] = None, **kwargs) -> str:
-        """Get translated text for user"""
-        language = 'en'  # Default to English
-        
-        if user_id is not None:
-            try:
-                language = user_logger.get_user_language(user_id)
-            except:
-                language = 'en'
-        
-        if language not in self.translations:
-            language = 'en'
-        
-        text = self.translations[language].get(key, key)
-        
-        # Format the text with provided kwargs (for simple substitutions like {username})
+    def __init__(self, locales_dir: str = LOCALES_DIR, default_locale: str = 'en'):
+        self.default_locale = default_locale
+        self.catalogs: Dict[str, Dict[str, CompiledTemplate]] = {}
+        self.load(locales_dir)
+
+    def load(self, locales_dir: str):
+        """Load and compile every <locale>.json catalog, reporting problems once"""
+        raw: Dict[str, Dict[str, str]] = {}
+        for filename in sorted(os.listdir(locales_dir)):
+            if filename.endswith(".json"):
+                with open(os.path.join(locales_dir, filename), encoding="utf-8") as f:
+                    raw[filename[:-5]] = json.load(f)
+
+        if self.default_locale not in raw:
+            raise RuntimeError(f"Default locale '{self.default_locale}' not found in {locales_dir}")
+
+        compiled: Dict[str, Dict[str, CompiledTemplate]] = {}
+        for locale, strings in raw.items():
+            catalog = {}
+            for key, text in strings.items():
+                try:
+                    catalog[key] = CompiledTemplate(text)
+                except ValueError as e:
+                    logger.error(f"Locale '{locale}': malformed template '{key}': {e}")
+            compiled[locale] = catalog
+
+        # Check every locale against the default one and fill the gaps from it,
+        # so a lookup is always a single dict access whatever the locale
+        base = compiled[self.default_locale]
+        for locale, catalog in compiled.items():
+            if locale == self.default_locale:
+                continue
+            for key, template in base.items():
+                if key not in catalog:
+                    logger.warning(f"Locale '{locale}': missing key '{key}', falling back to '{self.default_locale}'")
+                    catalog[key] = template
+                elif catalog[key].fields != template.fields:
+                    logger.warning(
+                        f"Locale '{locale}': placeholders of '{key}' {sorted(catalog[key].fields)} "
+                        f"differ from '{self.default_locale}' {sorted(template.fields)}"
+                    )
+            for key in catalog.keys() - base.keys():
+                logger.warning(f"Locale '{locale}': key '{key}' is not in '{self.default_locale}'")
+
+        self.catalogs = compiled
+        keyboard_cache.register("language", self._build_language_keyboard)
+        keyboard_cache.register("settings", self._build_settings_keyboard)
+
+    @property
+    def locales(self) -> List[str]:
+        return list(self.catalogs)
+
+    def resolve_locale(self, user_id: Optional[int]) -> str:
+        """Resolve the user's locale (done once per update by the pre-dispatch pipeline)"""
+        if user_id is None:
+            return self.default_locale
         try:
-            formatted_text = text.format(**kwargs)
-            return formatted_text
-        except KeyError:
-            # If some placeholders aren't provided, return text with basic formatting
-            return text
+            language = user_logger.get_user_language(user_id)
+        except Exception:
+            return self.default_locale
+        return language if language in self.catalogs else self.default_locale
+
+    def get_text(self, key: str, user_id: Optional[int] = None, locale: Optional[str] = None, **kwargs) -> str:
+        """Get translated text for a locale (or for a user if no locale is given)"""
+        if locale is None:
+            locale = self.resolve_locale(user_id)
+
+        catalog = self.catalogs.get(locale) or self.catalogs[self.default_locale]
+        template = catalog.get(key)
+        if template is None:
+            return key
+        return template.render(kwargs)
     
-    def get_language_keyboard(self, user_id: Optional[int] = None):
+    def get_language_keyboard(self, user_id: Optional[int] = None, locale: Optional[str] = None):
         """Get language selection keyboard"""
-        current_lang = user_logger.get_user_language(user_id) if user_id is not None else 'en'
-        
+        current_lang = locale if locale is not None else self.resolve_locale(user_id)
+        return keyboard_cache.get("language", current_lang)
+    
+    def get_settings_keyboard(self, user_id: Optional[int] = None, locale: Optional[str] = None):
+        """Get main settings keyboard"""
+        if locale is None:
+            locale = self.resolve_locale(user_id)
+        return keyboard_cache.get("settings", locale)
+    
+    def _build_language_keyboard(self, current_lang: str):
         from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
         
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        return InlineKeyboardMarkup(inline_keyboard=[
             [
                 InlineKeyboardButton(
-                    text="🇺🇸 English" + (" ✅" if current_lang == 'en' else ""),
-                    callback_data="lang_en"
-                ),
-                InlineKeyboardButton(
-                    text="🇷🇺 Русский" + (" ✅" if current_lang == 'ru' else ""),
-                    callback_data="lang_ru"
+                    text=self.get_text('language_name', locale=code) + (" ✅" if current_lang == code else ""),
+                    callback_data=f"lang_{code}"
                 )
+                for code in self.catalogs
             ]
         ])
-        
-        return keyboard
     
-    def get_settings_keyboard(self, user_id: Optional[int] = None):
-        """Get main settings keyboard"""
+    def _build_settings_keyboard(self, locale: str):
         from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
         
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        return InlineKeyboardMarkup(inline_keyboard=[
             [
                 InlineKeyboardButton(
-                    text=self.get_text('language', user_id),
+                    text=self.get_text('language', locale=locale),
                     callback_data="settings_language"
                 )
             ],
@@ -149,8 +147,6 @@ class LanguageManager:
                 )
             ]
         ])
-        
-        return keyboard
 
 # Global instance
 language_manager = LanguageManager()
\ No newline at end of file
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from .user_logger import user_logger, UserLogger
+
+logger = logging.getLogger(__name__)
+
+class InteractionLogWriter:
+    """Bounded queue of user_logs rows written in batches by a background task.
+
+    Middlewares only enqueue, so the event loop never waits on INSERT/COMMIT.
+    The queue is flushed when it reaches ``batch_size`` rows or every
+    ``flush_interval`` seconds; rows arriving while it is full are dropped.
+    """
+
+    def __init__(self, db: UserLogger, max_queue: int = 10000,
+                 batch_size: int = 200, flush_interval: float = 1.0):
+        self.user_logger = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    def enqueue(self, user_id: int, username: Optional[str],
+                first_name: Optional[str], last_name: Optional[str],
+                command: Optional[str] = None, message_text: Optional[str] = None,
+                chat_type: Optional[str] = None) -> bool:
+        """Queue an interaction row, return False if it was dropped"""
+        if self._queue.full():
+            self.dropped += 1
+            return False
+        self._queue.put_nowait((user_id, username, first_name, last_name, command, message_text, chat_type))
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self):
+        """Start the background writer task"""
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued and stop the writer task"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush()
+            if self._closing and self._queue.empty():
+                break
+
+    async def _flush(self):
+        while not self._queue.empty():
+            batch: List[tuple] = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                ok = await asyncio.to_thread(self.user_logger.log_user_interactions, batch)
+            except Exception as e:
+                logger.error(f"Interaction log batch failed: {e}")
+                ok = False
+            self.batches += 1
+            if ok:
+                self.written += len(batch)
+            else:
+                self.failed += len(batch)
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+# Global instance
+log_writer = InteractionLogWriter(user_logger)
@@ -0,0 +1,83 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+class MetadataCache:
+    """Process-wide cache of Yandex Music track, album, artist and playlist objects.
+
+    Shared by all users: a track that stays on for minutes, or is played by
+    many users at once, is fetched once. Cached objects keep a reference to
+    the client that fetched them, so only read metadata from them and go
+    through the user's own client for anything account-specific.
+    Playlists change more often than the rest and get a shorter TTL.
+    """
+
+    def __init__(self, maxsize: int = 5000, ttl: float = 6 * 3600, playlist_ttl: float = 600):
+        self.tracks = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.albums = TTLCache(maxsize=maxsize // 5, ttl=ttl)
+        self.artists = TTLCache(maxsize=maxsize // 5, ttl=ttl)
+        self.playlists = TTLCache(maxsize=maxsize // 5, ttl=playlist_ttl)
+
+    @staticmethod
+    def _track_key(track_id) -> str:
+        # "12345:678" (track:album) and 12345 refer to the same track
+        return str(track_id).split(":")[0]
+
+    async def get_tracks(self, client, track_ids: Iterable) -> List[Any]:
+        """Tracks in the requested order; all misses are fetched in one tracks() call"""
+        keys = [self._track_key(track_id) for track_id in track_ids]
+        found: Dict[str, Any] = {}
+        misses = []
+        for key in keys:
+            track = self.tracks.get(key)
+            if track is None:
+                misses.append(key)
+            else:
+                found[key] = track
+
+        if misses:
+            for track in await client.tracks(list(dict.fromkeys(misses))):
+                key = self._track_key(track.id)
+                self.tracks.set(key, track)
+                found[key] = track
+
+        return [found[key] for key in keys if key in found]
+
+    async def get_track(self, client, track_id) -> Optional[Any]:
+        tracks = await self.get_tracks(client, [track_id])
+        return tracks[0] if tracks else None
+
+    async def _get_one(self, cache: TTLCache, fetch, entity_id) -> Optional[Any]:
+        key = str(entity_id)
+        obj = cache.get(key)
+        if obj is None:
+            objs = await fetch(key)
+            obj = objs[0] if objs else None
+            if obj is not None:
+                cache.set(key, obj)
+        return obj
+
+    async def get_album(self, client, album_id) -> Optional[Any]:
+        return await self._get_one(self.albums, client.albums, album_id)
+
+    async def get_artist(self, client, artist_id) -> Optional[Any]:
+        return await self._get_one(self.artists, client.artists, artist_id)
+
+    async def get_playlist(self, client, playlist_id) -> Optional[Any]:
+        """Playlist by its "owner_uid:kind" id"""
+        return await self._get_one(self.playlists, client.playlists_list, playlist_id)
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "tracks": self.tracks.stats,
+            "albums": self.albums.stats,
+            "artists": self.artists.stats,
+            "playlists": self.playlists.stats,
+        }
+
+# Global instance
+music_cache = MetadataCache()
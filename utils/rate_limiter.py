@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+class RateLimiter:
+    """Per-user token bucket with a hard bound on memory.
+
+    A bucket holds up to ``burst`` tokens and regains one every ``interval``
+    seconds; each hit drains ``cost`` tokens. It is stored as a single float,
+    the time at which the bucket will be full again (GCRA), so a user whose
+    bucket has refilled needs no state at all. Entries live in an OrderedDict
+    in hit order: refilled ones are swept from the front on every check
+    (amortized O(1)) and once ``max_entries`` is reached the oldest entry is
+    evicted even if it has not refilled yet.
+
+    With the defaults (burst=1, cost=1) this is a plain fixed-interval cooldown.
+    """
+
+    def __init__(self, interval: float, burst: float = 1.0, max_entries: int = 100_000):
+        self.interval = interval
+        self.burst = burst
+        self.max_entries = max_entries
+        self._tolerance = interval * burst
+        self._full_at: "OrderedDict[int, float]" = OrderedDict()
+
+    def hit(self, user_id: int, cost: float = 1.0, now: Optional[float] = None) -> float:
+        """Drain ``cost`` tokens; return 0.0 if allowed, otherwise seconds left to wait"""
+        if now is None:
+            now = time.monotonic()
+        self._sweep(now)
+
+        full_at = self._full_at.get(user_id, now)
+        if full_at < now:
+            full_at = now
+        new_full_at = full_at + min(cost, self.burst) * self.interval
+
+        wait = new_full_at - now - self._tolerance
+        if wait > 0:
+            return wait
+
+        self._full_at[user_id] = new_full_at
+        self._full_at.move_to_end(user_id)
+        if len(self._full_at) > self.max_entries:
+            self._full_at.popitem(last=False)
+        return 0.0
+
+    def _sweep(self, now: float):
+        full_at = self._full_at
+        while full_at:
+            user_id = next(iter(full_at))
+            if full_at[user_id] > now:
+                break
+            del full_at[user_id]
+
+    def __len__(self) -> int:
+        return len(self._full_at)
+
+class RateLimit(NamedTuple):
+    """Rate profile a handler declares with ``flags={"rate_limit": PROFILE}``
+
+    Handlers sharing a profile ``name`` share one bucket per user: it holds
+    ``burst`` tokens, regains one every ``interval`` seconds and each call
+    drains ``cost`` tokens.
+    """
+    name: str
+    cost: float = 1.0
+    burst: float = 3.0
+    interval: float = 3.0
+
+# Cheap replies (/help, /settings, /start): generous bursts
+LIGHT = RateLimit("light", cost=1, burst=5, interval=1.0)
+# Any other message
+DEFAULT = RateLimit("default", cost=1, burst=3, interval=3.0)
+# Outbound I/O or subprocesses (/getweb, /whois, /status, /short): two in a row, then one per 15s
+HEAVY = RateLimit("heavy", cost=3, burst=6, interval=5.0)
+# Inline queries arrive on nearly every keystroke
+INLINE = RateLimit("inline", cost=1, burst=3, interval=0.7)
+# Inline queries doing network round trips or uploads (st, short, qr, tr, ym)
+INLINE_HEAVY = RateLimit("inline_heavy", cost=2, burst=4, interval=1.5)
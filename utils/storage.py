@@ -0,0 +1,122 @@
+import sqlite3
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+class Storage:
+    """Pool of long-lived SQLite connections shared by everything that touches the bot database.
+
+    Connections are opened lazily up to ``pool_size``, switched to WAL journal
+    mode and kept open, so each one reuses its prepared statement cache for the
+    constant SQL strings the callers pass in.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 4, timeout: float = 5.0,
+                 cached_statements: int = 128):
+        self.db_path = db_path
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=self.pool_size)
+        self._lock = threading.Lock()
+        self._opened = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._opened < self.pool_size
+            if can_open:
+                self._opened += 1
+
+        if can_open:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            return self._pool.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"No free database connection after {self.timeout}s")
+
+    def _release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        self._pool.put_nowait(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection for the duration of the block"""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection and commit on success (roll back on error)"""
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Run a single write statement in its own transaction, return rowcount"""
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> int:
+        """Run a write statement for every params tuple inside one transaction"""
+        with self.transaction() as conn:
+            return conn.executemany(sql, seq_of_params).rowcount
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        with self.connection() as conn:
+            cur = conn.execute(sql, params)
+            try:
+                return cur.fetchone()
+            finally:
+                cur.close()
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        with self.connection() as conn:
+            cur = conn.execute(sql, params)
+            try:
+                return cur.fetchall()
+            finally:
+                cur.close()
+
+    def close(self):
+        """Close every idle pooled connection"""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.close()
+            except Exception as e:
+                logger.error(f"Failed to close database connection: {e}")
+            with self._lock:
+                self._opened -= 1
@@ -1,57 +1,86 @@
-import sqlite3
+import asyncio
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+
+from .cache import TTLCache
+from .storage import Storage
+
+DEFAULT_SETTINGS = {"language": "en", "timezone": "UTC"}
 
 class UserLogger:
-    def __init__(self, db_path: str = "users.db"):
+    def __init__(self, db_path: str = "users.db", pool_size: int = 4,
+                 settings_cache_size: int = 10000, settings_ttl: float = 300.0):
         self.db_path = db_path
+        self.storage = Storage(db_path, pool_size=pool_size)
         self.init_database()
         self.logger = logging.getLogger("user_logger")
+        # Banned ids are few and read on every update: keep them in memory and
+        # swap the whole frozenset on change so readers never see a partial one
+        self._banned: frozenset = frozenset()
+        self._bans_version: Optional[int] = None
+        self.reload_bans()
+        # user_settings rows (including "no row" defaults), written through on change
+        self.settings_cache = TTLCache(maxsize=settings_cache_size, ttl=settings_ttl)
         
     def init_database(self):
         """Initialize the user logging database"""
-        db = sqlite3.connect(self.db_path)
-        cur = db.cursor()
-        
-        # Create users table for logging all interactions
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS user_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                username TEXT,
-                first_name TEXT,
-                last_name TEXT,
-                command TEXT,
-                message_text TEXT,
-                chat_type TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create banned users table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS banned_users (
-                user_id INTEGER PRIMARY KEY,
-                username TEXT,
-                banned_by TEXT,
-                ban_reason TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        with self.storage.transaction() as db:
+            cur = db.cursor()
+            
+            # Create users table for logging all interactions
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS user_logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    username TEXT,
+                    first_name TEXT,
+                    last_name TEXT,
+                    command TEXT,
+                    message_text TEXT,
+                    chat_type TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
         
-        # Create user settings table for language preferences
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS user_settings (
-                user_id INTEGER PRIMARY KEY,
-                language TEXT DEFAULT 'en',
-                timezone TEXT DEFAULT 'UTC',
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+            # Create banned users table
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS banned_users (
+                    user_id INTEGER PRIMARY KEY,
+                    username TEXT,
+                    banned_by TEXT,
+                    ban_reason TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
+            # Bumped by triggers on every change to banned_users, so other
+            # processes' bans are noticed without re-reading the table
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS bans_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    version INTEGER NOT NULL
+                )
+            """)
+            cur.execute("INSERT OR IGNORE INTO bans_version (id, version) VALUES (0, 0)")
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cur.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS banned_users_{event.lower()}
+                    AFTER {event} ON banned_users
+                    BEGIN
+                        UPDATE bans_version SET version = version + 1 WHERE id = 0;
+                    END
+                """)
         
-        db.commit()
-        db.close()
+            # Create user settings table for language preferences
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS user_settings (
+                    user_id INTEGER PRIMARY KEY,
+                    language TEXT DEFAULT 'en',
+                    timezone TEXT DEFAULT 'UTC',
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
     
     def log_user_interaction(self, user_id: int, username: Optional[str], 
                             first_name: Optional[str], last_name: Optional[str],
@@ -59,44 +88,53 @@ class UserLogger:
                             chat_type: Optional[str] = None):
         """Log user interaction to database"""
         try:
-            db = sqlite3.connect(self.db_path)
-            cur = db.cursor()
-            
-            cur.execute("""
+            self.storage.execute("""
                 INSERT INTO user_logs 
                 (user_id, username, first_name, last_name, command, message_text, chat_type)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (user_id, username, first_name, last_name, command, message_text, chat_type))
             
-            db.commit()
-            db.close()
-            
             # Also log to file for easy access
             self.logger.info(f"User {username} (ID: {user_id}) - Command: {command} - Message: {message_text}")
             
         except Exception as e:
             self.logger.error(f"Failed to log user interaction: {e}")
-    
+
+    def log_user_interactions(self, rows: List[tuple]) -> bool:
+        """Log a batch of interaction rows in a single transaction"""
+        try:
+            self.storage.executemany("""
+                INSERT INTO user_logs
+                (user_id, username, first_name, last_name, command, message_text, chat_type)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+            for user_id, username, _, _, command, message_text, _ in rows:
+                self.logger.info(f"User {username} (ID: {user_id}) - Command: {command} - Message: {message_text}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Failed to log {len(rows)} user interactions: {e}")
+            return False
+
     def ban_user(self, user_id: int, banned_by: str, reason: Optional[str] = None):
         """Ban a user"""
         try:
-            db = sqlite3.connect(self.db_path)
-            cur = db.cursor()
-            
-            # Get user info first
-            cur.execute("SELECT username FROM user_logs WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1", (user_id,))
-            user_data = cur.fetchone()
-            username = user_data[0] if user_data else "Unknown"
-            
-            cur.execute("""
-                INSERT OR REPLACE INTO banned_users 
-                (user_id, username, banned_by, ban_reason)
-                VALUES (?, ?, ?, ?)
-            """, (user_id, username, banned_by, reason))
-            
-            db.commit()
-            db.close()
-            
+            with self.storage.transaction() as db:
+                cur = db.cursor()
+                
+                # Get user info first
+                cur.execute("SELECT username FROM user_logs WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1", (user_id,))
+                user_data = cur.fetchone()
+                username = user_data[0] if user_data else "Unknown"
+                
+                cur.execute("""
+                    INSERT OR REPLACE INTO banned_users 
+                    (user_id, username, banned_by, ban_reason)
+                    VALUES (?, ?, ?, ?)
+                """, (user_id, username, banned_by, reason))
+            
+            self._banned = self._banned | {user_id}
             self.logger.info(f"User {username} (ID: {user_id}) banned by {banned_by}. Reason: {reason}")
             
         except Exception as e:
@@ -105,87 +143,96 @@ class UserLogger:
     def unban_user(self, user_id: int):
         """Unban a user"""
         try:
-            db = sqlite3.connect(self.db_path)
-            cur = db.cursor()
-            
-            cur.execute("DELETE FROM banned_users WHERE user_id = ?", (user_id,))
-            
-            db.commit()
-            db.close()
+            self.storage.execute("DELETE FROM banned_users WHERE user_id = ?", (user_id,))
             
+            self._banned = self._banned - {user_id}
             self.logger.info(f"User ID {user_id} unbanned")
             
         except Exception as e:
             self.logger.error(f"Failed to unban user: {e}")
     
     def is_user_banned(self, user_id: int) -> bool:
-        """Check if user is banned"""
+        """Check if user is banned (in-memory, no database access)"""
+        return user_id in self._banned
+    
+    def reload_bans(self):
+        """Reload the in-memory ban index from the database"""
         try:
-            db = sqlite3.connect(self.db_path)
-            cur = db.cursor()
-            
-            cur.execute("SELECT 1 FROM banned_users WHERE user_id = ?", (user_id,))
-            result = cur.fetchone()
-            
-            db.close()
-            return result is not None
+            version = self._read_bans_version()
+            rows = self.storage.fetchall("SELECT user_id FROM banned_users")
+            self._banned = frozenset(row[0] for row in rows)
+            self._bans_version = version
             
         except Exception as e:
-            self.logger.error(f"Failed to check ban status: {e}")
+            self.logger.error(f"Failed to load banned users: {e}")
+    
+    def reload_bans_if_changed(self) -> bool:
+        """Reload the ban index if banned_users changed since the last load"""
+        try:
+            if self._read_bans_version() == self._bans_version:
+                return False
+        except Exception as e:
+            self.logger.error(f"Failed to check bans version: {e}")
             return False
+        self.reload_bans()
+        return True
+    
+    def _read_bans_version(self) -> int:
+        return self.storage.fetchone("SELECT version FROM bans_version WHERE id = 0")[0]
+    
+    async def watch_bans(self, interval: float = 5.0):
+        """Poll for ban changes made elsewhere (e.g. another process) and refresh bans"""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.reload_bans_if_changed)
     
     def get_banned_users(self) -> list:
         """Get list of all banned users"""
         try:
-            db = sqlite3.connect(self.db_path)
-            cur = db.cursor()
-            
-            cur.execute("""
+            return self.storage.fetchall("""
                 SELECT user_id, username, banned_by, ban_reason, timestamp 
                 FROM banned_users 
                 ORDER BY timestamp DESC
             """)
-            results = cur.fetchall()
-            
-            db.close()
-            return results
             
         except Exception as e:
             self.logger.error(f"Failed to get banned users: {e}")
             return []
     
+    def get_user_settings(self, user_id: int) -> Dict[str, str]:
+        """Get a copy of the user settings row, served from cache when possible"""
+        settings = self.settings_cache.get(user_id)
+        if settings is not None:
+            return dict(settings)
+        
+        try:
+            result = self.storage.fetchone("SELECT language, timezone FROM user_settings WHERE user_id = ?", (user_id,))
+        except Exception as e:
+            self.logger.error(f"Failed to get user settings: {e}")
+            return dict(DEFAULT_SETTINGS)
+        
+        settings = {"language": result[0], "timezone": result[1]} if result else dict(DEFAULT_SETTINGS)
+        self.settings_cache.set(user_id, settings)
+        return dict(settings)
+    
     def set_user_language(self, user_id: int, language: str):
         """Set user language preference"""
         try:
-            db = sqlite3.connect(self.db_path)
-            cur = db.cursor()
-            
-            cur.execute("""
+            self.storage.execute("""
                 INSERT OR REPLACE INTO user_settings (user_id, language, updated_at)
                 VALUES (?, ?, CURRENT_TIMESTAMP)
             """, (user_id, language))
             
-            db.commit()
-            db.close()
+            # INSERT OR REPLACE resets the other columns to their defaults
+            self.settings_cache.set(user_id, {**DEFAULT_SETTINGS, "language": language})
             
         except Exception as e:
+            self.settings_cache.pop(user_id)
             self.logger.error(f"Failed to set user language: {e}")
     
     def get_user_language(self, user_id: int) -> str:
         """Get user language preference"""
-        try:
-            db = sqlite3.connect(self.db_path)
-            cur = db.cursor()
-            
-            cur.execute("SELECT language FROM user_settings WHERE user_id = ?", (user_id,))
-            result = cur.fetchone()
-            
-            db.close()
-            return result[0] if result else "en"
-            
-        except Exception as e:
-            self.logger.error(f"Failed to get user language: {e}")
-            return "en"
+        return self.get_user_settings(user_id)["language"]
 
 # Global instance
 user_logger = UserLogger()
\ No newline at end of file